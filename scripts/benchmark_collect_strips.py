@@ -0,0 +1,63 @@
+"""Benchmark the strip collection of QuadMesh against the former list-based implementation.
+
+Usage: python scripts/benchmark_collect_strips.py
+
+"""
+from __future__ import print_function
+
+import time
+
+from compas_pattern.datastructures.mesh_quad.mesh_quad import QuadMesh
+
+
+def grid_quad_mesh(n):
+	vertices = [[float(i), float(j), 0.0] for j in range(n + 1) for i in range(n + 1)]
+	faces = [[j * (n + 1) + i, j * (n + 1) + i + 1, (j + 1) * (n + 1) + i + 1, (j + 1) * (n + 1) + i] for j in range(n) for i in range(n)]
+	return QuadMesh.from_vertices_and_faces(vertices, faces)
+
+
+def collect_strips_list_based(mesh):
+	"""Former strip collection, popping edges from a list and removing the collected ones."""
+
+	strips = {}
+
+	edges = list(mesh.not_none_edges())
+
+	strip = -1
+	while len(edges) > 0:
+		strip += 1
+
+		u0, v0 = edges.pop()
+		strip_edges = mesh.collect_strip(u0, v0)
+		strips.update({strip: strip_edges})
+
+		for u, v in strip_edges:
+			if u != v:
+				if (u, v) in edges:
+					edges.remove((u, v))
+				elif (v, u) in edges:
+					edges.remove((v, u))
+
+	return strips
+
+
+# ==============================================================================
+# Main
+# ==============================================================================
+
+if __name__ == '__main__':
+
+	print('{:>8} {:>8} {:>12} {:>12}'.format('faces', 'strips', 'list [s]', 'index [s]'))
+
+	for n in [10, 20, 40, 80]:
+		mesh = grid_quad_mesh(n)
+
+		t0 = time.time()
+		strips = collect_strips_list_based(mesh)
+		t1 = time.time()
+		mesh.collect_strips()
+		t2 = time.time()
+
+		assert strips == mesh.strip
+
+		print('{:>8} {:>8} {:>12.4f} {:>12.4f}'.format(mesh.number_of_faces(), mesh.number_of_strips(), t1 - t0, t2 - t1))
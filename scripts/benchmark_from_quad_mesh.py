@@ -0,0 +1,75 @@
+"""Benchmark CoarseQuadMesh.from_quad_mesh against the former network-based patch extraction.
+
+Usage: python scripts/benchmark_from_quad_mesh.py
+
+"""
+from __future__ import print_function
+
+import time
+
+from compas_pattern.datastructures.network.network import Network
+from compas_pattern.datastructures.mesh.mesh import Mesh
+from compas_pattern.datastructures.mesh_quad_coarse.mesh_quad_coarse import CoarseQuadMesh
+
+from compas.topology import connected_components
+
+from compas.utilities import pairwise
+
+
+def dense_quad_mesh(d):
+	vertices = [[12.97, 24.33, 0.0], [18.31, 8.47, 0.0], [30.05, 18.85, 0.0], [17.14, 16.75, 0.0], [16.66, 22.97, 0.0], [14.18, 26.95, 0.0], [36.05, 26.37, 0.0], [26.18, 21.78, 0.0], [19.65, 12.29, 0.0], [9.36, 16.48, 0.0], [18.93, 16.27, 0.0], [7.35, 12.11, 0.0], [13.31, 14.7, 0.0], [18.7, 19.61, 0.0], [11.91, 10.59, 0.0], [17.16, 26.87, 0.0], [26.11, 26.63, 0.0], [22.85, 9.81, 0.0], [21.05, 7.56, 0.0], [22.14, 19.09, 0.0]]
+	faces = [[15, 5, 0, 4], [0, 9, 12, 4], [9, 11, 14, 12], [14, 1, 8, 12], [1, 18, 17, 8], [17, 2, 7, 8], [2, 6, 16, 7], [16, 15, 4, 7], [13, 19, 7, 4], [19, 10, 8, 7], [10, 3, 12, 8], [3, 13, 4, 12]]
+	coarse_quad_mesh = CoarseQuadMesh.from_vertices_and_faces(vertices, faces)
+	coarse_quad_mesh.collect_strips()
+	coarse_quad_mesh.init_strip_density()
+	coarse_quad_mesh.set_strips_density(d)
+	coarse_quad_mesh.densification()
+	return coarse_quad_mesh.quad_mesh
+
+
+def coarse_faces_network_based(quad_mesh):
+	"""Former patch extraction, with a network of the faces and a mesh per patch."""
+
+	polyedges = quad_mesh.singularity_polyedge_decomposition()
+
+	vertices = {vkey: quad_mesh.vertex_coordinates(vkey) for vkey in quad_mesh.vertices()}
+	singularity_edges = [(x, y) for polyedge in polyedges for u, v in pairwise(polyedge) for x, y in [(u, v), (v, u)]]
+
+	faces = {fkey: quad_mesh.face_vertices(fkey) for fkey in quad_mesh.faces()}
+	network_vertices = {fkey: quad_mesh.face_centroid(fkey) for fkey in quad_mesh.faces()}
+	network_edges = {(f1, f2) for f1 in quad_mesh.faces() for f2 in quad_mesh.face_neighbors(f1) if f1 < f2 and quad_mesh.face_adjacency_halfedge(f1, f2) not in singularity_edges}
+	network = Network.from_vertices_and_edges(network_vertices, network_edges)
+	coarse_faces_children = {}
+	for i, connected_faces in enumerate(connected_components(network.adjacency)):
+		mesh = Mesh.from_vertices_and_faces(vertices, [faces[face] for face in connected_faces])
+		coarse_faces_children[i] = [vkey for vkey in reversed(mesh.boundaries()[0]) if mesh.vertex_degree(vkey) == 2]
+
+	return coarse_faces_children
+
+
+def cycles(faces):
+	"""Faces as vertex cycles starting at their smallest key, for comparison."""
+
+	return sorted([face[face.index(min(face)):] + face[:face.index(min(face))] for face in faces])
+
+
+# ==============================================================================
+# Main
+# ==============================================================================
+
+if __name__ == '__main__':
+
+	print('{:>8} {:>8} {:>12} {:>12}'.format('faces', 'patches', 'network [s]', 'walk [s]'))
+
+	for d in [2, 4, 8, 16, 32]:
+		quad_mesh = dense_quad_mesh(d)
+
+		t0 = time.time()
+		faces = coarse_faces_network_based(quad_mesh)
+		t1 = time.time()
+		coarse_quad_mesh = CoarseQuadMesh.from_quad_mesh(quad_mesh)
+		t2 = time.time()
+
+		assert cycles(list(faces.values())) == cycles([coarse_quad_mesh.face_vertices(fkey) for fkey in coarse_quad_mesh.faces()])
+
+		print('{:>8} {:>8} {:>12.4f} {:>12.4f}'.format(quad_mesh.number_of_faces(), coarse_quad_mesh.number_of_faces(), t1 - t0, t2 - t1))
@@ -41,6 +41,8 @@ def two_colourable_projection(mesh, kmax = 1):
 	strip_network = mesh.strip_connectivity()
 	results = {(): is_network_two_colorable(strip_network)}
 
+	euler = mesh.euler()
+
 	# guarantee valid kmax
 	n = mesh.number_of_strips()
 	if kmax < 1 or kmax > n:
@@ -67,26 +69,31 @@ def two_colourable_projection(mesh, kmax = 1):
 			if combination in results:
 				continue
 			
-			# delete strips in mesh and check validity
-			copy_mesh = mesh.copy()
-			copy_mesh.collect_strips()
-			delete_strips(copy_mesh, combination, preserve_boundaries=True)
-			topological_validity = copy_mesh.is_manifold() and copy_mesh.euler() == mesh.euler()
-			if not topological_validity:
-				results[combination] = 'invalid topology'
-
-
-			# delete strip vertices in network and check colourability
-			else:
-				#copy_network = strip_network.copy()
-				#for vkey in combination:
-				#	copy_network.delete_vertex(vkey)
-				copy_network = copy_mesh.strip_connectivity()
-				two_colourability = is_network_two_colorable(copy_network)
-				if not two_colourability:
-					results[combination] = 'not two-colourable'
+			# delete strips in mesh and check validity, in a transaction rolled back afterwards instead of a copy
+			# the transaction is nested in the one of the caller, if any, and rolled back even if an error is raised
+			mesh.begin()
+			try:
+				delete_strips(mesh, combination, preserve_boundaries=True)
+				topological_validity = mesh.is_manifold() and mesh.euler() == euler
+				if not topological_validity:
+					results[combination] = 'invalid topology'
+
+				# delete strip vertices in network and check colourability
 				else:
-					results[combination] = (copy_mesh, copy_network, two_colourability)
+					#copy_network = strip_network.copy()
+					#for vkey in combination:
+					#	copy_network.delete_vertex(vkey)
+					copy_network = mesh.strip_connectivity()
+					two_colourability = is_network_two_colorable(copy_network)
+					if not two_colourability:
+						results[combination] = 'not two-colourable'
+					else:
+						copy_mesh = mesh.copy()
+						for skey, edges in mesh.strip.items():
+							copy_mesh.set_strip(skey, list(edges))
+						results[combination] = (copy_mesh, copy_network, two_colourability)
+			finally:
+				mesh.rollback()
 
 	return results
 
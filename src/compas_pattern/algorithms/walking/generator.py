@@ -41,7 +41,6 @@ if __name__ == '__main__':
 
 	from random import randint
 	import compas
-	from compas.datastructures import mesh_unify_cycles
 	from compas.plotters import MeshPlotter
 
 	for i in range(100):
@@ -59,7 +58,7 @@ if __name__ == '__main__':
 
 		walker = Walker.from_vertices_and_faces(vertices, faces)
 		walker.collect_strips()
-		mesh_unify_cycles(walker)
+		walker.unify_cycles()
 
 		walker.start_walking()
 
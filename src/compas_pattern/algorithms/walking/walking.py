@@ -1,5 +1,3 @@
-from collections import deque
-
 from compas_pattern.datastructures.mesh_quad.mesh_quad import QuadMesh
 from compas_pattern.datastructures.mesh_quad.grammar_pattern import add_strip
 
@@ -17,35 +15,69 @@ class Walker(QuadMesh):
 		self.position = None
 		self.direction = None
 		self.polyedge = None
+		self._polyedge_vertices = set()
+		self._polyedge_repeats = 0
+
+	def vertex_rotation(self, vkey):
+		"""Return the ordered neighbours of a vertex, cached until the topology changes.
+
+		Parameters
+		----------
+		vkey : hashable
+			A vertex key.
+
+		Returns
+		-------
+		list
+			The ordered neighbours of the vertex. The list is shared with the cache and must not be modified.
+
+		"""
+
+		# the rotation system is filled lazily with the visited vertices
+		rotation = self.cached('vertex_rotation', dict)
+		if vkey not in rotation:
+			rotation[vkey] = self.vertex_neighbors(vkey, ordered = True)
+		return rotation[vkey]
 
 	def start_walking(self):
 		self.position = list(self.vertices())[0]
-		self.direction = self.vertex_neighbors(self.position, ordered = True)[0]
+		self.direction = self.vertex_rotation(self.position)[0]
 
 	def forward(self):
 		u, v = self.position, self.direction
-		neighbors = self.vertex_neighbors(v, ordered = True)
+		neighbors = self.vertex_rotation(v)
 		i = neighbors.index(u)
 		w = neighbors[i + 1 - len(neighbors)]
 		self.position, self.direction = v, w
 		if self.polyedge:
-			self.polyedge.append(self.position)
+			self._append_to_polyedge(self.position)
 
-	def rotate(self):
+	def rotate(self, k = 1):
 		u, v = self.position, self.direction
-		neighbors = self.vertex_neighbors(u, ordered = True)
+		neighbors = self.vertex_rotation(u)
 		i = neighbors.index(v)
-		w = neighbors[i + 1 - len(neighbors)]
+		w = neighbors[(i + k) % len(neighbors)]
 		self.direction = w
 
 	def start_polyedge(self):
-		self.polyedge = [self.position]
-
-	def end_polyedge(self):
+		self.polyedge = []
+		self._polyedge_vertices = set()
+		self._polyedge_repeats = 0
+		self._append_to_polyedge(self.position)
+
+	def _append_to_polyedge(self, vkey):
+		# count the repeated vertices to check the polyedge validity in constant time
+		if vkey in self._polyedge_vertices:
+			self._polyedge_repeats += 1
+		else:
+			self._polyedge_vertices.add(vkey)
+		self.polyedge.append(vkey)
+
+	def end_polyedge(self, k_ring = 3, geometry = True):
 		if not self.is_polyedge_valid_strip():
 			print 'invalid polyedge for strip'
 			return 0
-		skey, left_polyedge, right_polyedge = add_strip(self, self.polyedge)
+		skey, left_polyedge, right_polyedge = add_strip(self, self.polyedge, k_ring, geometry)
 		self.position, self.direction = left_polyedge[-1], right_polyedge[-1]
 		self.polyedge = None
 		return skey
@@ -69,20 +101,33 @@ class Walker(QuadMesh):
 			return False
 
 		# the polyedge must be closed or have extremities on the boundary
-		if self.polyedge[0] == self.polyedge [-1] or (self.is_vertex_on_boundary(self.polyedge[0]) and self.is_vertex_on_boundary(self.polyedge[-1])):
-			occurences = [self.polyedge.count(i) for i in self.polyedge]
-			if self.polyedge[0] == self.polyedge [-1]:
-				occurences = occurences[1 : -1]
+		closed = self.polyedge[0] == self.polyedge[-1]
+		if closed or (self.is_vertex_on_boundary(self.polyedge[0]) and self.is_vertex_on_boundary(self.polyedge[-1])):
 			# the polyedge can not have multiple vertex occurences (except for the extremities if the polyedge is closed)
-			if not sum([i > 1 for i in occurences]):
+			if self._polyedge_repeats == (1 if closed else 0):
 				return True
 
 		return False
 
-	def apply_rules(self, string):
-		rules = deque(string)
-		while rules:
-			rule = rules.popleft()
+	def apply_rules(self, string, k_ring = 3, geometry = True):
+		"""Apply a string of walking rules.
+
+		Parameters
+		----------
+		string : str
+			The rules: 'f' for forward, 'r' for rotate, 's' for start polyedge and 'e' for end polyedge and add strip.
+		k_ring : int, None
+			The number of vertex rings around each new strip that are smoothed to widen it.
+			If None, the whole mesh is smoothed.
+			Default is 3.
+		geometry : bool
+			Whether to widen each new strip, or only to update the topology.
+			The geometry can then be rebuilt once with rebuild_geometry.
+			Default is True.
+
+		"""
+
+		for rule in string:
 			if rule == 'f':
 				self.forward()
 			elif rule == 'r':
@@ -90,7 +135,7 @@ class Walker(QuadMesh):
 			elif rule == 's':
 				self.start_polyedge()
 			elif rule == 'e':
-				self.end_polyedge()
+				self.end_polyedge(k_ring, geometry)
 
 
 # ==============================================================================
@@ -100,7 +145,6 @@ class Walker(QuadMesh):
 if __name__ == '__main__':
 
 	import compas
-	from compas.datastructures import mesh_unify_cycles
 	from compas.plotters import MeshPlotter
 
 	vertices = [
@@ -116,7 +160,7 @@ if __name__ == '__main__':
 
 	walker = Walker.from_vertices_and_faces(vertices, faces)
 	walker.collect_strips()
-	mesh_unify_cycles(walker)
+	walker.unify_cycles()
 
 	walker.start_walking()
 	#print walker.position, walker.direction
@@ -1,6 +1,10 @@
 import itertools
 
+from copy import copy
+
 from compas.datastructures.mesh import Mesh
+from compas.datastructures import mesh_flip_cycles
+from compas.datastructures import mesh_unify_cycles
 
 from compas.geometry import circle_from_points
 from compas.geometry import circle_from_points_xy
@@ -23,6 +27,13 @@ class Mesh(Mesh):
 
 	def __init__(self):
 		super(Mesh, self).__init__()
+		self.topology_version = 0
+		self.geometry_version = 0
+		self._cache = {}
+		self._transaction = None
+		self._outer_transactions = []
+		self._undo = []
+		self._redo = []
 
 
 	@classmethod
@@ -75,15 +86,437 @@ class Mesh(Mesh):
 			faces = [[key_index[key] for key in self.face_vertices(fkey)] for fkey in self.faces()]
 		return vertices, faces
 
+	# --------------------------------------------------------------------------
+	# versions and cache
+	# --------------------------------------------------------------------------
+
+	def update_version(self, topology=True):
+		"""Increment the version counters of the mesh, which invalidates the cached derived data.
+
+		The mesh modifiers and the vertex attribute setters call this method.
+		Call it after modifying the vertex, face or halfedge dictionaries directly,
+		or use unify_cycles and flip_cycles instead of the compas functions that rebuild the halfedges.
+
+		Parameters
+		----------
+		topology : bool, optional
+			Whether the topology changed or only the geometry.
+			Default is True.
+
+		"""
+
+		if topology:
+			self.topology_version += 1
+		self.geometry_version += 1
+
+	def cached(self, name, func, geometry=False):
+		"""Return data derived from the mesh, computed once per version of the mesh.
+
+		Parameters
+		----------
+		name : hashable
+			The name of the derived data.
+		func : callable
+			The function computing the derived data.
+		geometry : bool, optional
+			Whether the data depends on the geometry, or only on the topology.
+			Default is False.
+
+		Returns
+		-------
+		object
+			The derived data. It is shared with the cache and must not be modified.
+
+		Notes
+		-----
+		The geometry version is only incremented by the vertex attribute setters,
+		not by writes to the vertex attribute dictionaries, such as in the compas smoothing functions.
+		Data depending on the geometry should only be cached by code that controls all the writes until the data is used.
+
+		"""
+
+		if not self.is_cached(name, geometry):
+			self._cache[name] = ((self.topology_version, self.geometry_version if geometry else None), func())
+		return self._cache[name][1]
+
+	def is_cached(self, name, geometry=False):
+		"""Return whether derived data is cached for the current version of the mesh.
+
+		Parameters
+		----------
+		name : hashable
+			The name of the derived data.
+		geometry : bool, optional
+			Whether the data depends on the geometry, or only on the topology.
+			Default is False.
+
+		Returns
+		-------
+		bool
+			True if the cached data is up to date. False otherwise.
+
+		"""
+
+		version = (self.topology_version, self.geometry_version if geometry else None)
+		return name in self._cache and self._cache[name][0] == version
+
+	def clear(self):
+		if self.is_recording():
+			for name in self._journal_tables():
+				for key in getattr(self, name):
+					self._journal_record(name, key)
+		super(Mesh, self).clear()
+		self.update_version()
+
+	def add_vertex(self, key=None, attr_dict=None, **kwattr):
+		self.update_version()
+		if key is not None:
+			self._journal_record('vertex', key)
+			self._journal_record('halfedge', key)
+		key = super(Mesh, self).add_vertex(key, attr_dict, **kwattr)
+		self._journal_record('vertex', key, new=True)
+		self._journal_record('halfedge', key, new=True)
+		return key
+
+	def add_face(self, vertices, fkey=None, attr_dict=None, **kwattr):
+		self.update_version()
+		if fkey is not None:
+			self._journal_record('face', fkey)
+			self._journal_record('facedata', fkey)
+		for vkey in vertices:
+			if vkey in self.halfedge:
+				self._journal_record('halfedge', vkey)
+		fkey = super(Mesh, self).add_face(vertices, fkey, attr_dict, **kwattr)
+		if fkey is not None:
+			self._journal_record('face', fkey, new=True)
+			self._journal_record('facedata', fkey, new=True)
+		return fkey
+
+	def delete_vertex(self, key):
+		self.update_version()
+		if self._transaction is not None:
+			self._journal_record('vertex', key)
+			# the halfedges of the vertex, its neighbours and their neighbours can be deleted
+			self._journal_record('halfedge', key)
+			for nbr in self.halfedge[key]:
+				for vkey in [nbr] + list(self.halfedge[nbr]):
+					self._journal_record('halfedge', vkey)
+			for fkey in self.halfedge[key].values():
+				if fkey is not None:
+					self._journal_record('face', fkey)
+		super(Mesh, self).delete_vertex(key)
+
+	def delete_face(self, fkey):
+		self.update_version()
+		if self._transaction is not None:
+			self._journal_record('face', fkey)
+			for vkey in self.face[fkey]:
+				self._journal_record('halfedge', vkey)
+		super(Mesh, self).delete_face(fkey)
+
+	def cull_vertices(self):
+		self.update_version()
+		if self._transaction is not None:
+			for vkey in self.vertex:
+				if not self.halfedge.get(vkey):
+					self._journal_record('vertex', vkey)
+					self._journal_record('halfedge', vkey)
+		super(Mesh, self).cull_vertices()
+
+	def unify_cycles(self, root=None):
+		"""Unify the cycle directions of the faces.
+
+		Wraps mesh_unify_cycles, which rebuilds the halfedges,
+		to update the version and record the faces and the halfedges in transactions.
+
+		Parameters
+		----------
+		root : hashable, optional
+			The key of the root face.
+			Default is any face.
+
+		"""
+
+		self._journal_cycles()
+		mesh_unify_cycles(self, root)
+		self.update_version()
+
+	def flip_cycles(self):
+		"""Flip the cycle directions of the faces.
+
+		Wraps mesh_flip_cycles, which rebuilds the halfedges,
+		to update the version and record the faces and the halfedges in transactions.
+
+		"""
+
+		self._journal_cycles()
+		mesh_flip_cycles(self)
+		self.update_version()
+
+	def _journal_cycles(self):
+		if self._transaction is not None:
+			for fkey in self.face:
+				self._journal_record('face', fkey)
+			for vkey in self.halfedge:
+				self._journal_record('halfedge', vkey)
+
+	def set_vertex_attribute(self, key, name, value):
+		if name in ('x', 'y', 'z'):
+			self.update_version(topology=False)
+		self._journal_record('vertex', key)
+		super(Mesh, self).set_vertex_attribute(key, name, value)
+
+	# --------------------------------------------------------------------------
+	# transactions
+	# --------------------------------------------------------------------------
+
+	def begin(self):
+		"""Start a transaction recording the modifications of the mesh, to roll them back or undo them later without copying the mesh.
+
+		Only the former data of the vertices and faces touched by the mesh modifiers are recorded.
+		Transactions can be nested: a transaction started while another one is open
+		is rolled back on its own, or merged into the open one when committed.
+
+		"""
+
+		if self._transaction is not None:
+			self._outer_transactions.append(self._transaction)
+		self._transaction = {'attributes': self._journal_attributes(), 'items': {}}
+
+	def is_recording(self):
+		"""Return whether a transaction is open.
+
+		Returns
+		-------
+		bool
+			True if the modifications of the mesh are recorded. False otherwise.
+
+		"""
+
+		return self._transaction is not None
+
+	def commit(self):
+		"""Close the open transaction and add it to the undo history. The redo history is cleared.
+
+		A nested transaction is merged into the transaction it was started in instead.
+
+		"""
+
+		if self._transaction is None:
+			return
+
+		transaction, self._transaction = self._transaction, None
+		if self._outer_transactions:
+			# keep the data recorded by the outer transaction, which is older
+			self._transaction = self._outer_transactions.pop()
+			for item, value in transaction['items'].items():
+				self._transaction['items'].setdefault(item, value)
+		else:
+			self._undo.append(transaction)
+			self._redo = []
+
+	def rollback(self):
+		"""Revert the modifications of the open transaction and close it, without adding it to the history.
+
+		If the transaction is nested, the transaction it was started in goes on.
+
+		"""
+
+		if self._transaction is not None:
+			transaction, self._transaction = self._transaction, None
+			self._journal_restore(transaction)
+			if self._outer_transactions:
+				self._transaction = self._outer_transactions.pop()
+
+	def undo(self):
+		"""Revert the last transaction. The open transactions are committed first.
+
+		Returns
+		-------
+		bool
+			True if a transaction was reverted. False if the undo history is empty.
+
+		"""
+
+		while self._transaction is not None:
+			self.commit()
+		if not self._undo:
+			return False
+		self._redo.append(self._journal_restore(self._undo.pop()))
+		return True
+
+	def redo(self):
+		"""Apply again the last reverted transaction.
+
+		Returns
+		-------
+		bool
+			True if a transaction was applied. False if the redo history is empty.
+
+		"""
+
+		if self._transaction is not None or not self._redo:
+			return False
+		self._undo.append(self._journal_restore(self._redo.pop()))
+		return True
+
+	def record_vertex(self, vkey):
+		"""Record the data of a vertex in the open transaction, before modifying its attribute dictionary directly.
+
+		Parameters
+		----------
+		vkey : hashable
+			A vertex key.
+
+		"""
+
+		self._journal_record('vertex', vkey)
+
+	def _journal_tables(self):
+		# the dictionaries recorded per key in the transactions
+		return ['vertex', 'halfedge', 'face', 'facedata']
+
+	def _journal_attributes(self):
+		return {'_max_int_key': self._max_int_key, '_max_int_fkey': self._max_int_fkey, 'attributes': copy(self.attributes)}
+
+	def _journal_record(self, name, key, new=False):
+		# keep the data before the first modification in the transaction, None if the key did not exist
+		if self._transaction is not None and (name, key) not in self._transaction['items']:
+			self._transaction['items'][(name, key)] = None if new else copy(getattr(self, name).get(key))
+
+	def _journal_restore(self, transaction):
+		# restore the recorded data and return the transaction reverting the restoration
+		inverse = {'attributes': self._journal_attributes(), 'items': {}}
+
+		for (name, key), value in transaction['items'].items():
+			table = getattr(self, name)
+			inverse['items'][(name, key)] = copy(table.get(key))
+			if value is None:
+				if key in table:
+					del table[key]
+			else:
+				table[key] = copy(value)
+
+		for name, value in transaction['attributes'].items():
+			setattr(self, name, copy(value))
+
+		self.update_version()
+
+		return inverse
+
 	# --------------------------------------------------------------------------
 	# global
 	# --------------------------------------------------------------------------
 
+	def vertices_on_boundary(self, ordered=False):
+		"""Find the vertices on the boundary. Cached if not ordered.
+
+		Parameters
+		----------
+		ordered : bool, optional
+			If ``True``, Return the vertices in the same order as they are found on the boundary.
+			Default is ``False``.
+
+		Returns
+		-------
+		list
+			The vertices of the boundary.
+
+		"""
+
+		if ordered:
+			return super(Mesh, self).vertices_on_boundary(ordered=True)
+
+		return list(self.cached('vertices_on_boundary', super(Mesh, self).vertices_on_boundary))
+
+	def boundaries(self):
+		"""Collect the mesh boundaries as lists of vertices. Cached.
+
+		Returns
+		-------
+		boundaries : list
+			List of boundaries as lists of vertex keys.
+
+		"""
+
+		return [list(boundary) for boundary in self.cached('boundaries', super(Mesh, self).boundaries)]
+
+	def vertex_boundary_mask(self):
+		"""Map the vertices to whether they are on the boundary. Cached.
+
+		Once built, the mask answers the boundary queries on vertices until the topology changes.
+
+		Returns
+		-------
+		dict
+			A dictionary vertex key: True if on the boundary, False otherwise.
+			It is shared with the cache and must not be modified.
+
+		"""
+
+		return self.cached('vertex_boundary_mask', lambda: {vkey: None in self.halfedge[vkey].values() for vkey in self.vertices()})
+
+	def edge_boundary_mask(self):
+		"""Map the edges, in both directions, to whether they are on the boundary. Cached.
+
+		Once built, the mask answers the boundary queries on edges until the topology changes.
+
+		Returns
+		-------
+		dict
+			A dictionary (u, v): True if on the boundary, False otherwise.
+			It is shared with the cache and must not be modified.
+
+		"""
+
+		return self.cached('edge_boundary_mask', lambda: {(u, v): self.halfedge[u][v] is None or self.halfedge[v][u] is None for u in self.halfedge for v in self.halfedge[u]})
 
 	# --------------------------------------------------------------------------
 	# local
 	# --------------------------------------------------------------------------
 
+	def is_vertex_on_boundary(self, vkey):
+		"""Verify that a vertex is on a boundary, using the boundary mask if it is up to date.
+
+		Parameters
+		----------
+		vkey : hashable
+			The identifier of the vertex.
+
+		Returns
+		-------
+		bool
+			True if the vertex is on the boundary. False otherwise.
+
+		"""
+
+		if self.is_cached('vertex_boundary_mask'):
+			return self.vertex_boundary_mask()[vkey]
+
+		return super(Mesh, self).is_vertex_on_boundary(vkey)
+
+	def is_edge_on_boundary(self, u, v):
+		"""Verify that an edge is on a boundary, using the boundary mask if it is up to date.
+
+		Parameters
+		----------
+		u : hashable
+			The identifier of the first vertex.
+		v : hashable
+			The identifier of the second vertex.
+
+		Returns
+		-------
+		bool
+			True if the edge is on the boundary. False otherwise.
+
+		"""
+
+		if self.is_cached('edge_boundary_mask'):
+			return self.edge_boundary_mask()[u, v]
+
+		return super(Mesh, self).is_edge_on_boundary(u, v)
+
 	
 
 	# def delete_face(self, fkey):
@@ -238,9 +671,7 @@ def mesh_move_vertex(mesh, vector, vkey):
 
 	"""
 
-	mesh.vertex[vkey]['x'] += vector[0]
-	mesh.vertex[vkey]['y'] += vector[1]
-	mesh.vertex[vkey]['z'] += vector[2]
+	mesh.set_vertex_attributes(vkey, ['x', 'y', 'z'], [xyz + t for xyz, t in zip(mesh.vertex_coordinates(vkey), vector)])
 
 	return mesh.vertex_coordinates(vkey)
 
@@ -56,18 +56,14 @@ def quad_mesh_strip_n_coloring(quad_mesh):
 
 
 def quad_mesh_polyedge_graph(quad_mesh):
-    polyedges = quad_mesh.polyedges()
-    polyedges = [tuple(polyedge) for polyedge in polyedges]
+    polyedges, vertex_polyedges = quad_mesh.collect_polyedges()
 
     vertices = {i: centroid_points([quad_mesh.vertex_coordinates(vkey) for vkey in polyedge]) for i, polyedge in enumerate(polyedges)}
     edges = []
     for i, polyedge in enumerate(polyedges):
         for vkey in polyedge:
             if not quad_mesh.is_vertex_singular(vkey):
-                for j, polyedge_2 in enumerate(polyedges):
-                    if vkey in polyedge_2:
-                        edges.append((i, j))
-                        break
+                edges.append((i, vertex_polyedges[vkey][0]))
     return Network.from_vertices_and_edges(vertices, edges)
 
 
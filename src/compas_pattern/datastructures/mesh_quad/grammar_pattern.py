@@ -1,5 +1,7 @@
 from math import pi
 
+from collections import deque
+
 from compas_pattern.datastructures.mesh.mesh import Mesh
 from compas_pattern.datastructures.network.network import Network
 
@@ -13,8 +15,6 @@ from compas.topology import connected_components
 from compas.datastructures import network_disconnected_vertices
 from compas.topology import breadth_first_paths
 
-from compas.datastructures.mesh import mesh_smooth_centroid
-
 from compas.geometry import centroid_points
 from compas.geometry.transformations.transformations import project_point_line
 
@@ -24,6 +24,7 @@ from compas.utilities import geometric_key
 from compas.utilities import pairwise
 from compas_pattern.utilities.lists import sublist_from_to_items_in_closed_list
 from compas_pattern.utilities.lists import list_split
+from compas_pattern.utilities.union_find import union_find_groups
 
 
 __author__ = ['Robin Oval']
@@ -40,11 +41,12 @@ __all__ = [
     'split_strip',
     'split_strips',
     'strip_polyedge_update',
-    'boundary_strip_preserve'
+    'boundary_strip_preserve',
+    'rebuild_geometry'
 ]
 
 
-def edit_strips(mesh, strips_to_add=[], strips_to_delete=[], preserve_boundaries=False):
+def edit_strips(mesh, strips_to_add=[], strips_to_delete=[], preserve_boundaries=False, k_ring=3, geometry=True):
     """Add and delete strips.
 
     Parameters
@@ -57,6 +59,13 @@ def edit_strips(mesh, strips_to_add=[], strips_to_delete=[], preserve_boundaries
         A list of strip keys to delete.
     preserve_boundaries : bool
         A boolean whether to preserve boundaries that would be collapsed by refining strips without adding singularities.
+    k_ring : int, None
+        The number of vertex rings around each new strip that are smoothed to widen it.
+        If None, the whole mesh is smoothed.
+        Default is 3.
+    geometry : bool
+        Whether to update the geometry, or only the topology.
+        Default is True.
 
     Returns
     -------
@@ -64,13 +73,13 @@ def edit_strips(mesh, strips_to_add=[], strips_to_delete=[], preserve_boundaries
         The key of the new strips.
     """
 
-    new_skeys = add_strips(mesh, strips_to_add)
-    delete_strips(mesh, strips_to_delete, preserve_boundaries)
+    new_skeys = add_strips(mesh, strips_to_add, k_ring, geometry)
+    delete_strips(mesh, strips_to_delete, preserve_boundaries, geometry)
 
     return new_skeys
 
 
-def add_strip(mesh, polyedge):
+def add_strip(mesh, polyedge, k_ring=3, geometry=True):
     """Add a strip along a mesh polyedge.
 
     Parameters
@@ -79,6 +88,14 @@ def add_strip(mesh, polyedge):
         A mesh.
     polyedge : list
         List of vertex keys forming path.
+    k_ring : int, None
+        The number of vertex rings around the new strip that are smoothed to widen it.
+        If None, the whole mesh is smoothed, which is much slower on large meshes and gives a different geometry.
+        Default is 3.
+    geometry : bool
+        Whether to widen the new strip, or only to update the topology.
+        The new vertices are then placed on the polyedge vertices, until rebuild_geometry is called.
+        Default is True.
 
     Returns
     -------
@@ -87,7 +104,7 @@ def add_strip(mesh, polyedge):
 
     """
 
-    kinks_xyz = [mesh.vertex_coordinates(vkey) for vkey in mesh.kinks(pi / 12)]
+    kinks_xyz = mesh_kinks_xyz(mesh)
 
     # close or open status
     closed = polyedge[0] == polyedge[-1]
@@ -167,13 +184,13 @@ def add_strip(mesh, polyedge):
 
     # update transverse strip data
     for skey, i in update.items():
-        mesh.strip[skey] = mesh.collect_strip(
-            *list(pairwise(left_polyedge))[i])
+        mesh.set_strip(skey, mesh.collect_strip(
+            *list(pairwise(left_polyedge))[i]))
 
     # add new strip data
     new_skey = list(mesh.strips())[-1] + 1
-    mesh.strip[new_skey] = mesh.collect_strip(
-        left_polyedge[0], right_polyedge[0])
+    mesh.set_strip(new_skey, mesh.collect_strip(
+        left_polyedge[0], right_polyedge[0]))
 
     # update adjacent strips
     for i in range(len(polyedge)):
@@ -181,30 +198,123 @@ def add_strip(mesh, polyedge):
         mesh.substitute_vertex_in_strips(old, left, left_strips)
         mesh.substitute_vertex_in_strips(old, right, right_strips)
 
-    func_1(mesh, kinks_xyz, 20, 0.5)
+    if not geometry:
+        # the kinks of the initial geometry are kept to rebuild the geometry later
+        _keep_kinks_xyz(mesh, kinks_xyz)
+    elif k_ring is None:
+        func_1(mesh, kinks_xyz, 20, 0.5)
+    else:
+        func_1(mesh, kinks_xyz, 20, 0.5, mesh_vertices_k_ring(mesh, left_polyedge + right_polyedge, k_ring))
 
     return new_skey, left_polyedge, right_polyedge
 
 
-def func_1(mesh, fix_xyz, kmax, damping):
-    # geometrical processing: smooth to widen the strip with constraints at
-    # kinks and along boundaries
+def mesh_kinks_xyz(mesh):
+    """Return the coordinates of the boundary kinks that are fixed when widening strips.
+
+    After topology-only edits, the kinks are the ones of the geometry before the edits,
+    until rebuild_geometry is called or the geometry is edited otherwise.
+    Otherwise, they are computed from the current geometry, once per version of the mesh.
+
+    Parameters
+    ----------
+    mesh : Mesh
+        A mesh.
+
+    Returns
+    -------
+    list
+        The coordinates of the kinks. The list is shared with the cache and must not be modified.
+
+    Notes
+    -----
+    Call mesh.update_version(topology=False) after moving vertices through the vertex attribute dictionaries,
+    otherwise the kinks of the former geometry are returned.
+
+    """
+
+    kinks_xyz = _kept_kinks_xyz(mesh)
+    if kinks_xyz is not None:
+        return kinks_xyz
+
+    return mesh.cached('kinks_xyz', lambda: [mesh.vertex_coordinates(vkey) for vkey in mesh.kinks(pi / 12)], geometry=True)
+
+
+def rebuild_geometry(mesh, kmax=20, damping=0.5):
+    """Rebuild the geometry of a mesh after topology-only strip edits, with one global smoothing.
+
+    The kinks of the geometry before the edits are fixed and the other boundary vertices are projected on the boundaries.
+
+    Parameters
+    ----------
+    mesh : Mesh
+        A mesh.
+    kmax : int
+        The number of smoothing iterations.
+        Default is 20.
+    damping : float
+        The smoothing damping factor.
+        Default is 0.5.
+
+    """
 
-    def callback(k, args):
+    func_1(mesh, mesh_kinks_xyz(mesh), kmax, damping)
+    mesh._kinks_xyz = None
 
-        mesh, fixed, split_boundaries, split_boundaries_geom = args
-        
-        for vkey in mesh.vertices_on_boundary():
-            if vkey not in fixed:
-                for i, boundary in enumerate(split_boundaries):
-                    if vkey in boundary:
-                        xyz, dist = closest_point_on_polyline(split_boundaries_geom[i], mesh.vertex_coordinates(vkey))
-                        attr = mesh.vertex[vkey]
-                        attr['x'], attr['y'], attr['z'] = xyz
-                        break
+
+def _kept_kinks_xyz(mesh):
+    # the kinks kept by the topology-only edits, if the mesh was not modified otherwise since
+    kept = getattr(mesh, '_kinks_xyz', None)
+    if kept is not None and kept[0] == mesh.geometry_version:
+        return kept[1]
+    return None
+
+
+def _keep_kinks_xyz(mesh, kinks_xyz):
+    # keep the kinks after a topology-only edit, until the next edit of the geometry
+    mesh._kinks_xyz = (mesh.geometry_version, kinks_xyz)
+
+
+def mesh_vertices_k_ring(mesh, vertices, k):
+    """Return the vertices at most k edges away from given vertices.
+
+    Parameters
+    ----------
+    mesh : Mesh
+        A mesh.
+    vertices : list
+        The seed vertex keys.
+    k : int
+        The number of rings.
+
+    Returns
+    -------
+    set
+        The seed vertices and the vertices in their k rings.
+
+    """
+
+    ring = set(vertices)
+    front = set(vertices)
+    for i in range(k):
+        front = set([nbr for vkey in front for nbr in mesh.halfedge[vkey] if nbr not in ring])
+        ring.update(front)
+    return ring
+
+
+def func_1(mesh, fix_xyz, kmax, damping, vertices=None):
+    # geometrical processing: smooth to widen the strip with constraints at
+    # kinks and along boundaries, over all the vertices or only the given ones
+
+    if vertices is None:
+        free = list(mesh.vertices())
+        candidates = free
+    else:
+        free = list(vertices)
+        candidates = set(free).union(mesh.vertices_on_boundary())
 
     fix_map = {geometric_key(xyz): [] for xyz in fix_xyz}
-    for vkey in mesh.vertices():
+    for vkey in candidates:
         geom_key = geometric_key(mesh.vertex_coordinates(vkey))
         if geom_key in fix_map:
             fix_map[geom_key].append(vkey)
@@ -229,12 +339,42 @@ def func_1(mesh, fix_xyz, kmax, damping):
         indices = [boundary.index(vkey) for vkey in fixed if vkey in boundary]
         split_boundaries += list_split(boundary, indices)
     split_boundaries_geom = {i: [mesh.vertex_coordinates(vkey) for vkey in boundary] for i, boundary in enumerate(split_boundaries)}
-
-    callback_args = mesh, fixed, split_boundaries, split_boundaries_geom
-    mesh_smooth_centroid(mesh, fixed, kmax=kmax, damping=damping, callback=callback, callback_args=callback_args)
-
-
-def add_strips(mesh, polyedges):
+    # first split boundary of each boundary vertex
+    boundary_index = {}
+    for i, boundary in enumerate(split_boundaries):
+        for vkey in boundary:
+            boundary_index.setdefault(vkey, i)
+
+    # centroid smoothing of the free vertices, with the free boundary vertices projected back on the boundary after each iteration
+    fixed = set(fixed)
+    free = [vkey for vkey in free if vkey not in fixed]
+    free_boundary = [vkey for vkey in free if vkey in boundary_index]
+    neighbors = {vkey: mesh.vertex_neighbors(vkey) for vkey in free}
+    support = set(free).union([nbr for vkey in free for nbr in neighbors[vkey]])
+
+    for vkey in free:
+        mesh.record_vertex(vkey)
+
+    for k in range(kmax):
+        key_xyz = {vkey: mesh.vertex_coordinates(vkey) for vkey in support}
+
+        for vkey in free:
+            x, y, z = key_xyz[vkey]
+            cx, cy, cz = centroid_points([key_xyz[nbr] for nbr in neighbors[vkey]])
+            attr = mesh.vertex[vkey]
+            attr['x'] += damping * (cx - x)
+            attr['y'] += damping * (cy - y)
+            attr['z'] += damping * (cz - z)
+
+        for vkey in free_boundary:
+            xyz, dist = closest_point_on_polyline(split_boundaries_geom[boundary_index[vkey]], mesh.vertex_coordinates(vkey))
+            attr = mesh.vertex[vkey]
+            attr['x'], attr['y'], attr['z'] = xyz
+
+    mesh.update_version(topology=False)
+
+
+def add_strips(mesh, polyedges, k_ring=3, geometry=True):
     """Add strips along mesh polyedges.
 
     Parameters
@@ -243,6 +383,13 @@ def add_strips(mesh, polyedges):
         A mesh.
     polyedges : list
         List of polyedges as lists of vertex keys forming path.
+    k_ring : int, None
+        The number of vertex rings around each new strip that are smoothed to widen it.
+        If None, the whole mesh is smoothed.
+        Default is 3.
+    geometry : bool
+        Whether to widen the new strips, or only to update the topology.
+        Default is True.
 
     Returns
     -------
@@ -255,7 +402,7 @@ def add_strips(mesh, polyedges):
 
     while len(polyedges) > 0:
         polyedge = polyedges.pop()
-        new_skey, left_polyedge, right_polyedge = add_strip(mesh, polyedge)
+        new_skey, left_polyedge, right_polyedge = add_strip(mesh, polyedge, k_ring, geometry)
         new_skeys.append(new_skey)
         vertex_modifications = {vkey: [left_polyedge[
             i], right_polyedge[i]] for i, vkey in enumerate(polyedge)}
@@ -265,7 +412,7 @@ def add_strips(mesh, polyedges):
     return new_skeys
 
 
-def delete_strip(mesh, skey, preserve_boundaries=False):
+def delete_strip(mesh, skey, preserve_boundaries=False, geometry=True):
     """Delete a strip.
 
     Parameters
@@ -276,6 +423,10 @@ def delete_strip(mesh, skey, preserve_boundaries=False):
         A strip key.
     preserve_boundaries : bool
         A boolean whether to preserve boundaries that would be collapsed by refining strips without adding singularities.
+    geometry : bool
+        Whether to place the merged vertices, or only to update the topology.
+        The merged vertices are then placed on one of their former vertices, until rebuild_geometry is called.
+        Default is True.
 
     Returns
     -------
@@ -289,9 +440,13 @@ def delete_strip(mesh, skey, preserve_boundaries=False):
 
     if preserve_boundaries:
         skey_to_skeys = split_strips(
-            mesh, boundary_strip_preserve(mesh, [skey]))
+            mesh, boundary_strip_preserve(mesh, [skey]), geometry)
 
-    old_boundary_vertices = list(mesh.vertices_on_boundary())
+    if geometry:
+        old_boundary_vertices = set(mesh.vertices_on_boundary())
+    else:
+        # the kinks of the initial geometry are kept to rebuild the geometry later
+        kinks_xyz = mesh_kinks_xyz(mesh)
 
     # get strip data
     strip_edges = mesh.strip_edges(skey)
@@ -311,8 +466,7 @@ def delete_strip(mesh, skey, preserve_boundaries=False):
     parts = network_disconnected_vertices(network)
 
     # delete strip faces
-    for fkey in strip_faces:
-        mesh.delete_face_in_strips(fkey)
+    mesh.delete_faces_in_strips(strip_faces)
     for fkey in strip_faces:
         mesh.delete_face(fkey)
 
@@ -325,9 +479,12 @@ def delete_strip(mesh, skey, preserve_boundaries=False):
         # skip adding a vertex if all vertices of the part are disconnected
         if any(mesh.is_vertex_connected(vkey) for vkey in vertices):
 
-            # get position based on disconnected vertices that used to be on
+            # get position based on one of the vertices in topology-only mode
+            if not geometry:
+                points = [mesh.vertex_coordinates(vertices[0])]
+            # or based on disconnected vertices that used to be on
             # the boundary if any
-            if any(not mesh.is_vertex_connected(vkey) for vkey in vertices):
+            elif any(not mesh.is_vertex_connected(vkey) for vkey in vertices):
                 points = [mesh.vertex_coordinates(
                     vkey) for vkey in vertices if not mesh.is_vertex_connected(vkey)]
             # or based on old boundary vertices if any
@@ -351,14 +508,21 @@ def delete_strip(mesh, skey, preserve_boundaries=False):
         for old_vkey in vertices:
             mesh.delete_vertex(old_vkey)
 
-    del mesh.strip[skey]
+    mesh.remove_strip(skey)
+
+    if not geometry:
+        _keep_kinks_xyz(mesh, kinks_xyz)
 
     if preserve_boundaries:
         return skey_to_skeys
 
 
-def delete_strips(mesh, skeys, preserve_boundaries=False):
-    """Delete strips.
+def delete_strips(mesh, skeys, preserve_boundaries=False, geometry=True):
+    """Delete strips, all at once.
+
+    The vertices connected by the edges of the strips are merged in one pass,
+    with the same resulting topology as deleting the strips one after the other.
+    A merged vertex is placed like in delete_strip, based on all the vertices it replaces.
 
     Parameters
     ----------
@@ -368,6 +532,9 @@ def delete_strips(mesh, skeys, preserve_boundaries=False):
         Strip keys.
     preserve_boundaries : bool
         A boolean whether to preserve boundaries that would be collapsed by refining strips without adding singularities.
+    geometry : bool
+        Whether to place the merged vertices, or only to update the topology.
+        Default is True.
 
     Returns
     -------
@@ -378,18 +545,90 @@ def delete_strips(mesh, skeys, preserve_boundaries=False):
 
     if preserve_boundaries:
         skey_to_skeys = split_strips(
-            mesh, boundary_strip_preserve(mesh, skeys))
+            mesh, boundary_strip_preserve(mesh, skeys), geometry)
 
+    strips = []
     for skey in skeys:
-        delete_strip(mesh, skey)
+        if skey in mesh.strip and skey not in strips:
+            strips.append(skey)
+    skeys = strips
+
+    if geometry:
+        old_boundary_vertices = set(mesh.vertices_on_boundary())
+    else:
+        # the kinks of the initial geometry are kept to rebuild the geometry later
+        kinks_xyz = mesh_kinks_xyz(mesh)
+
+    # get strip data
+    strip_edges = [edge for skey in skeys for edge in mesh.strip_edges(skey)]
+    strip_faces = set([fkey for skey in skeys for fkey in mesh.strip_faces(skey)])
+
+    # groups of vertices connected by the strip edges to merge, in one union-find pass
+    groups = union_find_groups([vkey for edge in strip_edges for vkey in edge], strip_edges)
+
+    old_to_new = {}
+    for vertices in groups:
+
+        # skip adding a vertex if all vertices of the group are disconnected
+        disconnected = [vkey for vkey in vertices if all(fkey in strip_faces for fkey in mesh.vertex_faces(vkey))]
+        if len(disconnected) == len(vertices):
+            continue
+
+        # get position based on one of the vertices in topology-only mode
+        if not geometry:
+            points = [mesh.vertex_coordinates(vertices[0])]
+        # or based on disconnected vertices that used to be on the boundary if any
+        elif len(disconnected) > 0:
+            points = [mesh.vertex_coordinates(vkey) for vkey in disconnected]
+        # or based on old boundary vertices if any
+        elif any(vkey in old_boundary_vertices for vkey in vertices):
+            points = [mesh.vertex_coordinates(vkey) for vkey in vertices if vkey in old_boundary_vertices]
+        else:
+            points = [mesh.vertex_coordinates(vkey) for vkey in vertices]
+
+        # new vertex
+        x, y, z = centroid_points(points)
+        new_vkey = mesh.add_vertex(attr_dict={'x': x, 'y': y, 'z': z})
+        for vkey in vertices:
+            old_to_new[vkey] = new_vkey
+
+    # faces to update with the new vertices
+    faces = set([fkey for vkey in old_to_new for fkey in mesh.vertex_faces(vkey) if fkey not in strip_faces])
+
+    # delete strip faces and strip data
+    mesh.delete_faces_in_strips(strip_faces)
+    for fkey in strip_faces:
+        mesh.delete_face(fkey)
+    for skey in skeys:
+        mesh.remove_strip(skey)
+
+    # replace the old vertices
+    for fkey in faces:
+        face_vertices = [old_to_new.get(vkey, vkey) for vkey in mesh.face_vertices(fkey)]
+        mesh.delete_face(fkey)
+        mesh.add_face(face_vertices, fkey)
+    for old_vkey, new_vkey in old_to_new.items():
+        mesh.substitute_vertex_in_strips(old_vkey, new_vkey)
+
+    # delete the old vertices
+    for vertices in groups:
+        for vkey in vertices:
+            mesh.delete_vertex(vkey)
+
+    if not geometry:
+        _keep_kinks_xyz(mesh, kinks_xyz)
 
     if preserve_boundaries:
         return skey_to_skeys
 
 
-def split_strip(mesh, skey, n=2):
+def split_strip(mesh, skey, n=2, geometry=True):
     """Refine a strip in n strips.
 
+    The n - 1 rows of new vertices are interpolated along the strip edges and the strip faces are split in one pass.
+    The new strips are on the side of the first contour polyedge of the strip, in order.
+    Strips with pole edges or crossing themselves are refined by adding strips along their contour.
+
     Parameters
     ----------
     mesh : QuadMesh
@@ -399,6 +638,10 @@ def split_strip(mesh, skey, n=2):
     n : int
         The refinement value.
         Default value is two
+    geometry : bool
+        Whether to widen the new strips, or only to update the topology.
+        Only used if the strip is refined by adding strips.
+        Default is True.
 
     Returns
     -------
@@ -407,10 +650,90 @@ def split_strip(mesh, skey, n=2):
 
     """
 
-    return [skey] + [add_strip(mesh, mesh.strip_contour_polyedges(skey)[0])[0] for i in range(n - 1)]
+    if n < 2:
+        return [skey]
+
+    edges = mesh.strip_edges(skey)
+    closed = not any(u == v for u, v in edges) and mesh.is_strip_closed(skey)
+    faces = [mesh.halfedge[u].get(v) for u, v in (edges if closed else edges[:-1])]
+
+    if any(u == v for u, v in edges) or any(mesh.face_strips(fkey).count(skey) > 1 for fkey in faces):
+        return [skey] + [add_strip(mesh, mesh.strip_contour_polyedges(skey)[0], geometry=geometry)[0] for i in range(n - 1)]
+
+    # the interpolated vertices do not change the boundary, so the kinks kept by former topology-only edits stay valid
+    kinks_xyz = _kept_kinks_xyz(mesh)
+
+    # columns of vertices interpolated along the strip edges
+    columns = []
+    for u, v in edges:
+        xyz_u, xyz_v = mesh.vertex_coordinates(u), mesh.vertex_coordinates(v)
+        column = [u]
+        for k in range(1, n):
+            t = float(k) / n
+            x, y, z = [a + t * (b - a) for a, b in zip(xyz_u, xyz_v)]
+            column.append(mesh.add_vertex(attr_dict={'x': x, 'y': y, 'z': z}))
+        column.append(v)
+        columns.append(column)
+
+    # split the strip faces, from the first contour polyedge to the second one
+    face_index = {}
+    transverse_strips = []
+    for fkey in faces:
+        for strip in mesh.face_strips(fkey):
+            if strip != skey and strip is not None and strip not in transverse_strips:
+                transverse_strips.append(strip)
+
+    for i, fkey in enumerate(faces):
+        left, right = columns[i], columns[(i + 1) % len(columns)]
+        sub_faces = []
+        for k in range(n):
+            face_vertices = [left[k], left[k + 1], right[k + 1], right[k]]
+            sub_faces.append([vkey for j, vkey in enumerate(face_vertices) if vkey != face_vertices[j - 1]])
+        # the face key is kept for the degenerated face of a pole, if any, or for the face in the existing strip
+        kept = ([k for k, face_vertices in enumerate(sub_faces) if len(face_vertices) < 4] + [n - 1])[0]
+        mesh.delete_face(fkey)
+        for k, face_vertices in enumerate(sub_faces):
+            face_index[mesh.add_face(face_vertices, fkey if k == kept else None)] = i
+
+    # insert the new edges in the transverse strips
+    for strip in transverse_strips:
+        strip_edges = mesh.strip_edges(strip)
+        new_edges = []
+        for j, (a, b) in enumerate(strip_edges):
+            new_edges.append((a, b))
+            if j + 1 < len(strip_edges):
+                c, d = strip_edges[j + 1]
+            elif mesh.is_strip_closed(strip):
+                c, d = strip_edges[0]
+            else:
+                continue
+            fkey = mesh.halfedge[a].get(b) if a != b else mesh.halfedge[d].get(c)
+            if fkey not in face_index:
+                continue
+            i = face_index[fkey]
+            left, right = columns[i], columns[(i + 1) % len(columns)]
+            # the face halfedges are oriented from the left to the right column on the second contour polyedge
+            if (a, b) == (left[-1], right[-1]):
+                new_edges += [(left[k], right[k]) for k in reversed(range(1, n))]
+            else:
+                new_edges += [(right[k], left[k]) for k in range(1, n)]
+        mesh.set_strip(strip, new_edges)
+
+    # update the existing strip and add the new strips from the first contour polyedge
+    new_skeys = []
+    for k in range(n - 1):
+        new_skey = list(mesh.strips())[-1] + 1
+        mesh.set_strip(new_skey, [(column[k], column[k + 1]) for column in columns])
+        new_skeys.append(new_skey)
+    mesh.set_strip(skey, [(column[-2], column[-1]) for column in columns])
+
+    if kinks_xyz is not None:
+        _keep_kinks_xyz(mesh, kinks_xyz)
 
+    return [skey] + new_skeys
 
-def split_strips(mesh, skey_to_n):
+
+def split_strips(mesh, skey_to_n, geometry=True):
     """Refine strips in n strips each.
 
     Parameters
@@ -419,6 +742,9 @@ def split_strips(mesh, skey_to_n):
         A quad mesh.
     skey_to_n : dict
         Dictionary of strip keys to refine pointing to refinement value.
+    geometry : bool
+        Whether to widen the new strips, or only to update the topology.
+        Default is True.
 
     Returns
     -------
@@ -427,7 +753,7 @@ def split_strips(mesh, skey_to_n):
 
     """
 
-    return {skey: split_strip(mesh, skey, n) for skey, n in skey_to_n.items()}
+    return {skey: split_strip(mesh, skey, n, geometry) for skey, n in skey_to_n.items()}
 
 
 def strip_polyedge_update(mesh, polyedge, vertex_modifications):
@@ -447,6 +773,13 @@ def strip_polyedge_update(mesh, polyedge, vertex_modifications):
     shortest_polyedge: list
         The updated polyedge as a list of vertex keys.
 
+    Notes
+    -----
+    The polyedge is found with layered_shortest_path, in linear time for simple polyedges.
+    If the polyedge passes several times through the same vertices, the layers of candidate vertices overlap
+    and the search also keeps track of the overlapping vertices used, which multiplies the number of states
+    by the number of their combinations along the paths.
+
     """
 
     closed = polyedge[0] == polyedge[-1]
@@ -458,11 +791,12 @@ def strip_polyedge_update(mesh, polyedge, vertex_modifications):
     polyedge_modifications = {vkey: (vertex_modifications[
                                      vkey] if vkey in vertex_modifications else [vkey]) for vkey in polyedge}
     # list all candidate vertices to form new polyedge
-    candidate_vertices = tuple(
-        set([vkey for vkeys in polyedge_modifications.values() for vkey in vkeys]))
+    candidate_vertices = set([vkey for vkeys in polyedge_modifications.values() for vkey in vkeys])
     # adjacency restricted to candidate vertices
-    adjacency = {vkey: [nbr for nbr in mesh.vertex_neighbors(
-        vkey) if nbr in candidate_vertices] for vkey in mesh.vertices() if vkey in candidate_vertices}
+    adjacency = {vkey: [nbr for nbr in mesh.vertex_neighbors(vkey) if nbr in candidate_vertices] for vkey in candidate_vertices if vkey in mesh.vertex}
+
+    # candidate vertices for each position in the polyedge
+    layers = [set(polyedge_modifications[vkey]) for vkey in polyedge]
 
     # for each combination of boundary vertex extremities, get the shortest
     # valid path through the modified vertices of the polyedges
@@ -473,31 +807,15 @@ def strip_polyedge_update(mesh, polyedge, vertex_modifications):
             # end vertices on boundary
             for vkey_end in polyedge_modifications[polyedge[-1]]:
                 if mesh.is_vertex_on_boundary(vkey_end):
-                    # iterate through all paths between start and end vertices
-                    # starting by the shortest
-                    for candidate_polyedge in breadth_first_paths(adjacency, vkey_start, vkey_end):
-                        is_valid = True
-                        # if was initailly closed, make sure that temporary end
-                        # is adjacent to start
-                        if closed:
-                            if candidate_polyedge[0] not in mesh.vertex_neighbors(candidate_polyedge[-1]):
-                                continue
-                        # check that vertices in path come from the modified
-                        # vertices of the polyedge in the same order
-                        i = 0
-                        for vkey in candidate_polyedge:
-                            if vkey in polyedge_modifications[polyedge[i]]:
-                                continue
-                            elif vkey in polyedge_modifications[polyedge[i + 1]]:
-                                i += 1
-                            else:
-                                is_valid = False
-                                break
-                        # update if shorter
-                        if is_valid:
-                            if shortest_polyedge is None or len(shortest_polyedge) > len(candidate_polyedge):
-                                shortest_polyedge = candidate_polyedge
-                            break
+                    # if was initailly closed, make sure that temporary end
+                    # is adjacent to start
+                    if closed and vkey_start not in mesh.vertex_neighbors(vkey_end):
+                        continue
+                    candidate_polyedge = layered_shortest_path(adjacency, layers, vkey_start, vkey_end)
+                    # update if shorter
+                    if candidate_polyedge is not None:
+                        if shortest_polyedge is None or len(shortest_polyedge) > len(candidate_polyedge):
+                            shortest_polyedge = candidate_polyedge
 
     if closed:
         shortest_polyedge.append(shortest_polyedge[0])
@@ -505,6 +823,129 @@ def strip_polyedge_update(mesh, polyedge, vertex_modifications):
     return shortest_polyedge
 
 
+def layered_shortest_path(adjacency, layers, root, goal):
+    """Find the shortest path between two vertices that goes through given layers of vertices in order.
+
+    The search is a breadth-first search over the states (vertex, layer index),
+    where a path can only stay in the same layer or move to the next one.
+    Each state is visited once and the path is only rebuilt from the parent states once the goal is reached.
+    Among the shortest paths, the one found first by breadth_first_paths is returned:
+    the neighbours are visited in the same order, without the vertices of the path to the state.
+    Since the path is a shortest one, only the parent vertex or vertices at least two edges back along the path
+    can be neighbours, and only the latter, which are rare, are looked for along the path.
+
+    If the layers overlap, the states also hold the vertices in several layers that the path went through,
+    so that the paths through them in different orders are all searched and the path found is still a shortest one.
+    It may then differ from the one found first by breadth_first_paths.
+    The number of states grows with the combinations of these vertices along the paths,
+    which stays small for polyedges passing a few times through the same vertices.
+
+    Parameters
+    ----------
+    adjacency : dict
+        An adjacency dictionary.
+    layers : list
+        The sets of vertices in each layer, in order.
+    root : hashable
+        The start vertex, in the first layer.
+    goal : hashable
+        The end vertex.
+
+    Returns
+    -------
+    list, None
+        The shortest path as a list of vertices. None if there is none.
+
+    """
+
+    adjacency = {key: set(nbrs) for key, nbrs in adjacency.items()}
+
+    def is_ancestor(ancestor, state):
+        while depth[state] > depth[ancestor]:
+            state = parent[state]
+        return state == ancestor
+
+    # the vertices in several layers, which a path could otherwise go through twice
+    count = {}
+    for layer in layers:
+        for vkey in layer:
+            count[vkey] = count.get(vkey, 0) + 1
+    overlap = set([vkey for vkey, k in count.items() if k > 1])
+
+    root_state = (root, 0, frozenset([root]) & overlap)
+    parent = {root_state: None}
+    depth = {root_state: 0}
+    # the states of each visited vertex, unique for disjoint layers
+    visited = {root: [root_state]}
+    tovisit = deque([root_state])
+
+    while tovisit:
+        state = tovisit.popleft()
+        node, i, used = state
+
+        path = set([node])
+        for nbr in adjacency[node]:
+            for nbr_state in visited.get(nbr, ()):
+                if nbr_state == parent[state] or (depth[nbr_state] < depth[state] - 1 and is_ancestor(nbr_state, state)):
+                    path.add(nbr)
+
+        for nbr in adjacency[node] - path:
+            # stay in the same layer or move to the next one
+            if nbr in layers[i]:
+                j = i
+            elif i + 1 < len(layers) and nbr in layers[i + 1]:
+                j = i + 1
+            else:
+                continue
+            next_state = (nbr, j, used | frozenset([nbr]) if nbr in overlap else used)
+
+            if next_state in parent:
+                continue
+            parent[next_state] = state
+            depth[next_state] = depth[state] + 1
+            visited.setdefault(nbr, []).append(next_state)
+
+            if nbr == goal:
+                path = []
+                while next_state is not None:
+                    path.append(next_state[0])
+                    next_state = parent[next_state]
+                return path[::-1]
+
+            tovisit.append(next_state)
+
+    return None
+
+
+def is_layered_path(path, layers):
+    """Check if a path goes through given layers of vertices in order.
+
+    Parameters
+    ----------
+    path : list
+        A list of vertices.
+    layers : list
+        The sets of vertices in each layer, in order.
+
+    Returns
+    -------
+    bool
+        True if the path starts in the first layer and each of its vertices is in the same layer
+        as the previous one or in the next one. False otherwise.
+
+    """
+
+    i = 0
+    for vkey in path:
+        if vkey in layers[i]:
+            continue
+        elif i + 1 < len(layers) and vkey in layers[i + 1]:
+            i += 1
+        else:
+            return False
+    return True
+
+
 def boundary_strip_preserve(mesh, skeys):
     """Computes strips to split to preserve boundaries before deleting strips.
 
@@ -1,5 +1,6 @@
 from math import floor
 from operator import itemgetter
+from collections import Counter
 
 from compas_pattern.datastructures.mesh.mesh import Mesh
 from compas_pattern.datastructures.network.network import Network
@@ -26,6 +27,12 @@ class QuadMesh(Mesh):
 	def __init__(self):
 		super(QuadMesh, self).__init__()
 		self.strip = {}
+		self.edge_to_strip = {}
+		self.face_to_strips = {}
+		self.vertex_to_strip_edges = {}
+		self.strip_version = None
+		# the boundary kinks kept by the topology-only strip edits, with the geometry version they are valid for
+		self._kinks_xyz = None
 
 	def not_none_edges(self):
 		"""Returns the edges oriented inwards.
@@ -93,7 +100,7 @@ class QuadMesh(Mesh):
 				return None
 			
 			else:
-				return [nbr for nbr in self.vertex_neighbors(v) if nbr != u and self.is_vertex_on_boundary(nbr)][0]
+				return [nbr for nbr in self.halfedge[v] if nbr != u and self.is_vertex_on_boundary(nbr)][0]
 		
 		else:
 			nbrs = self.vertex_neighbors(v, ordered = True)
@@ -112,7 +119,11 @@ class QuadMesh(Mesh):
 			The list of vertex indices that are quad mesh singularities.
 
 		"""
-		return [vkey for vkey in self.vertices() if self.is_vertex_singular(vkey)]
+		def singularities():
+			self.vertex_boundary_mask()
+			return [vkey for vkey in self.vertices() if self.is_vertex_singular(vkey)]
+
+		return list(self.cached('singularities', singularities))
 
 	def is_vertex_singular(self, vkey):
 		"""Output whether a vertex is quad mesh singularity.
@@ -129,11 +140,9 @@ class QuadMesh(Mesh):
 
 		"""
 
-		if (self.is_vertex_on_boundary(vkey) and self.vertex_degree(vkey) != 3) or (not self.is_vertex_on_boundary(vkey) and self.vertex_degree(vkey) != 4):
-			return True
+		regular_valency = 3 if self.is_vertex_on_boundary(vkey) else 4
 
-		else:
-			return False
+		return len(self.halfedge[vkey]) != regular_valency
 
 	def vertex_index(self, vkey):
 		"""Compute vertex index.
@@ -150,13 +159,28 @@ class QuadMesh(Mesh):
 
 		"""
 
-		if self.vertex_degree(vkey) == 0:
+		degree = len(self.halfedge[vkey])
+
+		if degree == 0:
 			return 0
 
 		regular_valency = 4 if not self.is_vertex_on_boundary(vkey) else 3
 
-		return (regular_valency - self.vertex_degree(vkey)) / 4
+		return (regular_valency - degree) / 4
+
+	def vertex_indices(self):
+		"""Compute the indices of all the vertices, from their degrees and the boundary mask.
+
+		Returns
+		-------
+		dict
+			A dictionary vertex key: vertex index.
+
+		"""
+
+		self.vertex_boundary_mask()
 
+		return {vkey: self.vertex_index(vkey) for vkey in self.vertices()}
 
 	def polyedge(self, u0, v0):
 		"""Returns all the edges in the polyedge of the input edge.
@@ -177,7 +201,7 @@ class QuadMesh(Mesh):
 
 		polyedge = [u0, v0]
 
-		while len(polyedge) <= self.number_of_vertices():
+		while len(polyedge) <= len(self.vertex):
 
 			# end if closed loop
 			if polyedge[0] == polyedge[-1]:
@@ -199,37 +223,63 @@ class QuadMesh(Mesh):
 
 		return polyedge
 
-	def polyedges(self):
-		"""Collect the polyedges accross four-valent vertices between boundaries and/or singularities.
-
-		Parameters
-		----------
+	def collect_polyedges(self):
+		"""Collect the polyedges accross four-valent vertices between boundaries and/or singularities,
+		with a map from the vertices to the polyedges they belong to.
 
 		Returns
 		-------
 		polyedges : list
 			List of quad polyedges as list of vertices.
+		vertex_polyedges : dict
+			Dictionary of vertex keys pointing to the sorted indices of the polyedges including the vertex.
 
 		"""
 
+		polyedges, vertex_polyedges = self.cached('polyedges', self._collect_polyedges)
+		return [list(polyedge) for polyedge in polyedges], {vkey: list(indices) for vkey, indices in vertex_polyedges.items()}
+
+	def _collect_polyedges(self):
+		# the boundary mask answers the boundary queries while walking the polyedges
+		self.vertex_boundary_mask()
+
 		polyedges = []
+		vertex_polyedges = {}
+
+		visited = set()
 
-		edges = list(self.edges())
+		for u0, v0 in reversed(list(self.edges())):
 
-		while len(edges) > 0:
+			# skip collected edges
+			if (u0, v0) in visited:
+				continue
 
 			# collect new polyedge
-			u0, v0 = edges.pop()
-			polyedges.append(self.polyedge(u0, v0))
+			polyedge = self.polyedge(u0, v0)
+			for u, v in pairwise(polyedge):
+				visited.add((u, v))
+				visited.add((v, u))
+
+			for vkey in set(polyedge):
+				vertex_polyedges.setdefault(vkey, []).append(len(polyedges))
+			polyedges.append(polyedge)
+
+		return polyedges, vertex_polyedges
+
+	def polyedges(self):
+		"""Collect the polyedges accross four-valent vertices between boundaries and/or singularities.
+
+		Parameters
+		----------
+
+		Returns
+		-------
+		polyedges : list
+			List of quad polyedges as list of vertices.
 
-			# remove collected edges
-			for u, v in pairwise(polyedges[-1]):
-				if (u, v) in edges:
-					edges.remove((u, v))
-				elif (v, u) in edges:
-					edges.remove((v, u))
+		"""
 
-		return polyedges
+		return self.collect_polyedges()[0]
 
 	def polylines(self):
 		"""Return the polylines of the quad mesh.
@@ -256,12 +306,8 @@ class QuadMesh(Mesh):
 		# keep only polyedges connected to singularities or along the boundary		
 		polyedges = [polyedge for polyedge in self.polyedges() if self.is_vertex_singular(polyedge[0]) or self.is_vertex_singular(polyedge[-1]) or self.is_edge_on_boundary(polyedge[0], polyedge[1])]									
 
-		# get intersections between polyedges for split
-		vertices = [vkey for polyedge in polyedges for vkey in set(polyedge)]
-		split_vertices = [vkey for vkey in self.vertices() if vertices.count(vkey) > 1]
-		
 		# split singularity polyedges
-		return [split_polyedge for polyedge in polyedges for split_polyedge in list_split(polyedge, [polyedge.index(vkey) for vkey in split_vertices if vkey in polyedge])]
+		return self.split_polyedges_at_intersections(polyedges)
 
 	def singularity_polylines(self):
 		"""Return the polylines connected to singularities.
@@ -283,10 +329,11 @@ class QuadMesh(Mesh):
 			The polyedges forming the decomposition.
 
 		"""
-		polyedges = [polyedge for polyedge in self.polyedges() if (self.is_vertex_singular(polyedge[0]) or self.is_vertex_singular(polyedge[-1])) and not self.is_edge_on_boundary(polyedge[0], polyedge[1])]									
+		all_polyedges = self.polyedges()
+		polyedges = [polyedge for polyedge in all_polyedges if (self.is_vertex_singular(polyedge[0]) or self.is_vertex_singular(polyedge[-1])) and not self.is_edge_on_boundary(polyedge[0], polyedge[1])]									
 
 		# split boundaries
-		all_splits = self.singularities()
+		all_splits = set(self.singularities())
 		for boundary in self.boundaries():
 			splits = [vkey for vkey in boundary if vkey in all_splits]
 			new_splits = []
@@ -308,18 +355,44 @@ class QuadMesh(Mesh):
 					if not self.is_edge_on_boundary(vkey, nbr):
 						new_polyedge = self.polyedge(vkey, nbr)
 						polyedges.append(new_polyedge)
-						all_splits = list(set(all_splits + new_polyedge))
+						all_splits.update(new_polyedge)
 						break
 
 		# add boundaries
-		polyedges += [polyedge for polyedge in self.polyedges() if self.is_edge_on_boundary(polyedge[0], polyedge[1])]
+		polyedges += [polyedge for polyedge in all_polyedges if self.is_edge_on_boundary(polyedge[0], polyedge[1])]
 
-		# get intersections between polyedges for split
-		vertices = [vkey for polyedge in polyedges for vkey in set(polyedge)]
-		split_vertices = [vkey for vkey in self.vertices() if vertices.count(vkey) > 1]
-		
 		# split singularity polyedges
-		return [split_polyedge for polyedge in polyedges for split_polyedge in list_split(polyedge, [polyedge.index(vkey) for vkey in split_vertices if vkey in polyedge])]
+		return self.split_polyedges_at_intersections(polyedges)
+
+	def split_polyedges_at_intersections(self, polyedges):
+		"""Split polyedges at the vertices they share with other polyedges.
+
+		Parameters
+		----------
+		polyedges : list
+			List of polyedges as lists of vertices.
+
+		Returns
+		-------
+		list
+			The split polyedges.
+
+		"""
+
+		# get intersections between polyedges for split
+		count = Counter([vkey for polyedge in polyedges for vkey in set(polyedge)])
+		split_vertices = set([vkey for vkey, n in count.items() if n > 1])
+
+		split_polyedges = []
+		for polyedge in polyedges:
+			# split at the first occurence of each intersection vertex
+			indices = {}
+			for i, vkey in enumerate(polyedge):
+				if vkey in split_vertices and vkey not in indices:
+					indices[vkey] = i
+			split_polyedges += list_split(polyedge, list(indices.values()))
+
+		return split_polyedges
 
 	# --------------------------------------------------------------------------
 	# strip topology
@@ -362,7 +435,7 @@ class QuadMesh(Mesh):
 			
 		edges = [(u0, v0)]
 
-		count = self.number_of_edges()
+		count = 4 * len(self.face)
 		while count > 0:
 			count -= 1
 
@@ -390,28 +463,166 @@ class QuadMesh(Mesh):
 		strip : int
 			The number of strips.
 
+		Notes
+		-----
+		The strip data is only collected again if the topology changed or if the strips were edited since the last collection.
+
 		"""
 
-		self.strip = {}
+		if self.strip_version == self.topology_version:
+			return len(self.strip) - 1
 
-		edges = list(self.not_none_edges())
+		if self.is_recording():
+			for name in ['strip', 'edge_to_strip', 'face_to_strips', 'vertex_to_strip_edges']:
+				for key in getattr(self, name):
+					self._journal_record(name, key)
 
-		strip = -1
-		while len(edges) > 0:
-			strip += 1
+		self.strip = {}
+		self.edge_to_strip = {}
+		self.face_to_strips = {}
+		self.vertex_to_strip_edges = {}
 
-			u0, v0 = edges.pop()
-			strip_edges = self.collect_strip(u0, v0)
-			self.strip.update({strip: strip_edges})
+		# seed new strips from the last edges not yet collected, the strip index marks the collected edges
+		strip = -1
+		for u0, v0 in reversed(self.not_none_edges()):
+			if (u0, v0) not in self.edge_to_strip:
+				strip += 1
+				self.set_strip(strip, self.collect_strip(u0, v0))
 
-			for u, v in strip_edges:
-				if (u, v) in edges:
-					edges.remove((u, v))
-				elif (v, u) in edges:
-					edges.remove((v, u))
+		self.strip_version = self.topology_version
 
 		return strip
 
+	# --------------------------------------------------------------------------
+	# strip index
+	# --------------------------------------------------------------------------
+
+	def index_strips(self):
+		"""Rebuild the edge, face and vertex indices of the strip data.
+
+		"""
+
+		if self.is_recording():
+			for name in ['edge_to_strip', 'face_to_strips', 'vertex_to_strip_edges']:
+				for key in getattr(self, name):
+					self._journal_record(name, key)
+
+		self.edge_to_strip = {}
+		self.face_to_strips = {}
+		self.vertex_to_strip_edges = {}
+
+		for skey, edges in self.strip.items():
+			for u, v in edges:
+				self._index_strip_edge(skey, u, v)
+			self._index_strip_vertices(skey)
+
+	def _face_halfedge_parity(self, fkey, u):
+		# the two strips of a quad face cross the halfedges starting at even and odd positions, respectively
+		return self.face_vertices(fkey).index(u) % 2
+
+	def _index_strip_edge(self, skey, u, v):
+		if u == v:
+			return
+
+		for edge in [(u, v), (v, u)]:
+			self._journal_record('edge_to_strip', edge)
+			self.edge_to_strip[edge] = skey
+
+		for a, b in [(u, v), (v, u)]:
+			fkey = self.halfedge.get(a, {}).get(b)
+			if fkey is not None:
+				self._journal_record('face_to_strips', fkey)
+				self.face_to_strips.setdefault(fkey, [None, None])[self._face_halfedge_parity(fkey, a)] = skey
+
+	def _unindex_strip_edge(self, skey, u, v):
+		for edge in [(u, v), (v, u)]:
+			if self.edge_to_strip.get(edge) == skey:
+				self._journal_record('edge_to_strip', edge)
+				del self.edge_to_strip[edge]
+
+	def _index_strip_vertices(self, skey):
+		for i, edge in enumerate(self.strip[skey]):
+			for vkey in edge:
+				self._journal_record('vertex_to_strip_edges', vkey)
+				self.vertex_to_strip_edges.setdefault(vkey, set()).add((skey, i))
+
+	def _unindex_strip_vertices(self, skey):
+		for i, edge in enumerate(self.strip[skey]):
+			for vkey in edge:
+				self._journal_record('vertex_to_strip_edges', vkey)
+				self.vertex_to_strip_edges.get(vkey, set()).discard((skey, i))
+
+	def set_strip(self, skey, edges):
+		"""Set the edges of a new or existing strip and update the strip index.
+
+		Parameters
+		----------
+		skey : hashable
+			A strip key.
+		edges : list
+			The list of the edges in the strip.
+
+		"""
+
+		self.strip_version = None
+		self._journal_record('strip', skey)
+
+		if skey in self.strip:
+			for u, v in self.strip[skey]:
+				self._unindex_strip_edge(skey, u, v)
+			self._unindex_strip_vertices(skey)
+
+		self.strip[skey] = edges
+
+		for u, v in edges:
+			self._index_strip_edge(skey, u, v)
+		self._index_strip_vertices(skey)
+
+	def remove_strip(self, skey):
+		"""Remove a strip from the strip data and the strip index.
+
+		Parameters
+		----------
+		skey : hashable
+			A strip key.
+
+		"""
+
+		self.strip_version = None
+		self._journal_record('strip', skey)
+
+		for u, v in self.strip[skey]:
+			self._unindex_strip_edge(skey, u, v)
+			for fkey in [self.halfedge.get(u, {}).get(v), self.halfedge.get(v, {}).get(u)]:
+				if fkey in self.face_to_strips:
+					self._journal_record('face_to_strips', fkey)
+					self.face_to_strips[fkey] = [None if strip == skey else strip for strip in self.face_to_strips[fkey]]
+		self._unindex_strip_vertices(skey)
+
+		del self.strip[skey]
+
+	# --------------------------------------------------------------------------
+	# transactions
+	# --------------------------------------------------------------------------
+
+	def _journal_tables(self):
+		return super(QuadMesh, self)._journal_tables() + ['strip', 'edge_to_strip', 'face_to_strips', 'vertex_to_strip_edges']
+
+	def _journal_attributes(self):
+		attributes = super(QuadMesh, self)._journal_attributes()
+		attributes['strip_version'] = self.strip_version == self.topology_version
+		attributes['_kinks_xyz'] = self._kinks_xyz[1] if self._kinks_xyz is not None and self._kinks_xyz[0] == self.geometry_version else None
+		return attributes
+
+	def _journal_restore(self, transaction):
+		inverse = super(QuadMesh, self)._journal_restore(transaction)
+		# the restored strip data is up to date if it was at the start of the transaction
+		self.strip_version = self.topology_version if transaction['attributes']['strip_version'] else None
+		# and so are the kept kinks
+		kinks_xyz = transaction['attributes']['_kinks_xyz']
+		self._kinks_xyz = (self.geometry_version, kinks_xyz) if kinks_xyz is not None else None
+		return inverse
+
 	def is_strip_closed(self, skey):
 		"""Output whether a strip is closed.
 
@@ -460,9 +671,24 @@ class QuadMesh(Mesh):
 			The strip of the edge.
 		"""
 
-		for strip, edges in self.strip.items():
-			if edge in edges or tuple(reversed(edge)) in edges:
-				return strip
+		return self.edge_to_strip.get(tuple(edge))
+
+	def vertex_strip_edges(self, vkey):
+		"""Return the strip edges including a vertex.
+
+		Parameters
+		----------
+		vkey : hashable
+			A vertex key.
+
+		Returns
+		-------
+		list
+			The sorted list of (strip key, edge position in the strip) of the strip edges including the vertex.
+
+		"""
+
+		return sorted(self.vertex_to_strip_edges.get(vkey, []))
 
 	def strip_faces(self, skey):
 		"""Return the faces of a strip.
@@ -494,7 +720,7 @@ class QuadMesh(Mesh):
 			The two strips of the face.
 		"""
 
-		return [self.edge_strip((u, v)) for u, v in list(self.face_halfedges(fkey))[:2]]
+		return list(self.face_to_strips.get(fkey, [None, None]))
 
 	def substitute_vertex_in_strips(self, old_vkey, new_vkey, strips = None):
 		"""Substitute a vertex by another one.
@@ -510,23 +736,71 @@ class QuadMesh(Mesh):
 
 		"""
 
-		if strips is None:
-			strips = list(self.strips())
-		self.strip.update({skey: [tuple([new_vkey if vkey == old_vkey else vkey for vkey in list(edge)]) for edge in self.strip[skey]] for skey in strips})
+		self.strip_version = None
+
+		# only the strip edges including the old vertex are visited
+		self._journal_record('vertex_to_strip_edges', old_vkey)
+		strip_edges = {}
+		for skey, i in self.vertex_to_strip_edges.pop(old_vkey, set()):
+			strip_edges.setdefault(skey, []).append(i)
+
+		for skey, positions in strip_edges.items():
+			if strips is not None and skey not in strips:
+				for i in positions:
+					self.vertex_to_strip_edges.setdefault(old_vkey, set()).add((skey, i))
+				continue
+			self._journal_record('strip', skey)
+			edges = list(self.strip[skey])
+			for i in positions:
+				self._unindex_strip_edge(skey, *edges[i])
+				edges[i] = tuple([new_vkey if vkey == old_vkey else vkey for vkey in edges[i]])
+				self._index_strip_edge(skey, *edges[i])
+				self._journal_record('vertex_to_strip_edges', new_vkey)
+				self.vertex_to_strip_edges.setdefault(new_vkey, set()).add((skey, i))
+			self.strip[skey] = edges
 
 	def delete_face_in_strips(self, fkey):
 		"""Delete face in strips.
 
 		Parameters
 		----------
-		old_vkey : hashable
-			The old vertex key.
-		new_vkey : hashable
-			The new vertex key.
+		fkey : hashable
+			The face key.
 
 		"""
 
-		self.strip = {skey: [(u, v) for u, v in self.strip[skey] if self.halfedge[u][v] != fkey] for skey in self.strips()}
+		self.delete_faces_in_strips([fkey])
+
+	def delete_faces_in_strips(self, fkeys):
+		"""Delete faces in strips, in one pass over the strips of the faces.
+
+		Parameters
+		----------
+		fkeys : list
+			The face keys.
+
+		"""
+
+		self.strip_version = None
+
+		fkeys = set(fkeys)
+
+		strips = set()
+		for fkey in fkeys:
+			self._journal_record('face_to_strips', fkey)
+			strips.update([skey for skey in self.face_to_strips.pop(fkey, self.strips()) if skey is not None])
+
+		for skey in strips:
+			self._journal_record('strip', skey)
+			self._unindex_strip_vertices(skey)
+			edges = []
+			for u, v in self.strip[skey]:
+				if self.halfedge[u].get(v) in fkeys:
+					self._unindex_strip_edge(skey, u, v)
+				else:
+					edges.append((u, v))
+			self.strip[skey] = edges
+			self._index_strip_vertices(skey)
 
 	def strip_connectivity(self):
 		"""Compute the network showing the connecitivty of the strips: a network vertex is a quad mesh strip and a network edge is a quad mesh face.
@@ -656,7 +930,67 @@ class QuadMesh(Mesh):
 		"""
 
 		starts, ends = self.strip_contour_polyedges(skey)
-		return ([self.vertex_coordinates(vkey) for vkey in starts], [self.vertex_coordinates(vkey) for vkey in ends])	
+		return ([self.vertex_coordinates(vkey) for vkey in starts], [self.vertex_coordinates(vkey) for vkey in ends])
+
+	def strip_polylines_numpy(self):
+		"""Return the polylines of all the strips at once, as flat coordinate arrays with offsets.
+
+		The polylines of strip i are the rows offsets[i] to offsets[i + 1] of the matching coordinate array.
+		They are the same as the ones of strip_edge_polyline, strip_face_polyline and strip_contour_polylines.
+
+		Returns
+		-------
+		dict
+			'strips': the list of the strip keys;
+			'edge_offsets': the (s + 1,) array of the offsets of the edge midpoint and contour polylines;
+			'edge_polylines': the (n, 3) array of the edge midpoints;
+			'contour_polylines': the pair of (n, 3) arrays of the edge start and end points;
+			'face_offsets': the (s + 1,) array of the offsets of the face centroid polylines;
+			'face_polylines': the (m, 3) array of the face centroids.
+
+		Notes
+		-----
+		Requires numpy.
+
+		"""
+
+		import numpy as np
+
+		key_index = self.key_index()
+		xyz = np.array([[attr['x'], attr['y'], attr['z']] for vkey, attr in self.vertices(True)], dtype=float)
+
+		fkey_index = {fkey: i for i, fkey in enumerate(self.faces())}
+		face_vertices = [[key_index[vkey] for vkey in self.face_vertices(fkey)] for fkey in self.faces()]
+		face_sizes = np.array([len(vertices) for vertices in face_vertices], dtype=int)
+		face_starts = np.cumsum(face_sizes) - face_sizes
+		centroids = np.add.reduceat(xyz[[i for vertices in face_vertices for i in vertices]], face_starts, axis=0) / face_sizes[:, np.newaxis]
+
+		strips = list(self.strips())
+		starts, ends, faces = [], [], []
+		edge_offsets, face_offsets = [0], [0]
+		for skey in strips:
+			edges = self.strip_edges(skey)
+			strip_faces = self.strip_faces(skey)
+			if self.is_strip_closed(skey):
+				edges = edges + edges[: 1]
+				strip_faces = strip_faces + strip_faces[: 1]
+			starts += [key_index[u] for u, v in edges]
+			ends += [key_index[v] for u, v in edges]
+			faces += [fkey_index[fkey] for fkey in strip_faces]
+			edge_offsets.append(len(starts))
+			face_offsets.append(len(faces))
+
+		start_points = xyz[np.array(starts, dtype=int)]
+		end_points = xyz[np.array(ends, dtype=int)]
+
+		return {
+			'strips': strips,
+			'edge_offsets': np.array(edge_offsets, dtype=int),
+			'edge_polylines': (start_points + end_points) / 2.0,
+			'contour_polylines': (start_points, end_points),
+			'face_offsets': np.array(face_offsets, dtype=int),
+			'face_polylines': centroids[np.array(faces, dtype=int)],
+		}
 
 # ==============================================================================
 # Main
@@ -0,0 +1,448 @@
+from __future__ import division
+
+from compas_pattern.datastructures.mesh_quad.mesh_quad import QuadMesh
+
+__author__     = ['Robin Oval']
+__copyright__  = 'Copyright 2018, Block Research Group - ETH Zurich'
+__license__    = 'MIT License'
+__email__      = 'oval@arch.ethz.ch'
+
+__all__ = [
+	'QuadMeshArray',
+]
+
+class QuadMeshArray(object):
+	"""Read-only snapshot of a quad mesh stored in numpy arrays.
+
+	Parameters
+	----------
+	vertex_keys : list
+		The vertex keys, in the order of the vertex indices.
+	xyz : array-like
+		The vertex coordinates, as an (n, 3) array.
+	face_keys : list
+		The face keys, in the order of the face indices.
+	faces : list
+		The faces, as lists of vertex keys.
+
+	Attributes
+	----------
+	xyz : array
+		The (n, 3) array of vertex coordinates.
+	face_offsets : array
+		The CSR offsets of the faces in the face vertex array, with one more item than the faces.
+	face_vertices : array
+		The CSR array of the face vertex indices.
+	halfedge_start, halfedge_end, halfedge_face : array
+		The start vertex, end vertex and face of each halfedge.
+		The halfedges of a face are stored in the same order as its vertices.
+	halfedge_next : array
+		The next halfedge in the face of each halfedge.
+	halfedge_twin : array
+		The opposite halfedge of each halfedge, or -1 if the edge is on the boundary.
+	vertex_keys, face_keys : list
+		The maps from the indices to the keys.
+	key_index, fkey_index : dict
+		The maps from the keys to the indices.
+
+	Notes
+	-----
+	Requires numpy.
+	The arrays are read-only. Edit the quad mesh and take a new snapshot to apply changes.
+	The strips, polyedges and boundaries are the same as the ones of the quad mesh,
+	but their order and their starting items may differ.
+
+	"""
+
+	def __init__(self, vertex_keys, xyz, face_keys, faces):
+		import numpy as np
+
+		self.vertex_keys = list(vertex_keys)
+		self.key_index = {vkey: i for i, vkey in enumerate(self.vertex_keys)}
+		self.face_keys = list(face_keys)
+		self.fkey_index = {fkey: i for i, fkey in enumerate(self.face_keys)}
+
+		n = len(self.vertex_keys)
+		self.xyz = np.array(xyz, dtype=float).reshape((n, 3))
+
+		counts = np.array([len(face) for face in faces], dtype=int)
+		self.face_offsets = np.zeros(len(counts) + 1, dtype=int)
+		np.cumsum(counts, out=self.face_offsets[1:])
+		self.face_vertices = np.array([self.key_index[vkey] for face in faces for vkey in face], dtype=int)
+
+		# halfedges in face order, each halfedge going from a face vertex to the next one
+		h = np.arange(len(self.face_vertices))
+		self.halfedge_face = np.repeat(np.arange(len(counts)), counts)
+		local = h - self.face_offsets[self.halfedge_face]
+		self.halfedge_next = self.face_offsets[self.halfedge_face] + (local + 1) % counts[self.halfedge_face]
+		self.halfedge_start = self.face_vertices
+		self.halfedge_end = self.face_vertices[self.halfedge_next]
+
+		# twins matched by sorting the halfedges on their (start, end) codes
+		codes = self.halfedge_start * n + self.halfedge_end
+		twin_codes = self.halfedge_end * n + self.halfedge_start
+		order = np.argsort(codes)
+		positions = np.minimum(np.searchsorted(codes[order], twin_codes), len(codes) - 1)
+		candidates = order[positions]
+		self.halfedge_twin = np.where(codes[candidates] == twin_codes, candidates, -1)
+
+		for array in [self.xyz, self.face_offsets, self.face_vertices, self.halfedge_face, self.halfedge_next, self.halfedge_end, self.halfedge_twin]:
+			array.flags.writeable = False
+
+		self._strips = None
+		self._polyedges = None
+
+	# --------------------------------------------------------------------------
+	# conversions
+	# --------------------------------------------------------------------------
+
+	@classmethod
+	def from_quad_mesh(cls, mesh):
+		"""Take a snapshot of a quad mesh.
+
+		Parameters
+		----------
+		mesh : QuadMesh
+			A quad mesh.
+
+		Returns
+		-------
+		QuadMeshArray
+			The snapshot of the quad mesh.
+
+		"""
+
+		vertex_keys = list(mesh.vertices())
+		face_keys = list(mesh.faces())
+		xyz = [mesh.vertex_coordinates(vkey) for vkey in vertex_keys]
+		faces = [mesh.face_vertices(fkey) for fkey in face_keys]
+		return cls(vertex_keys, xyz, face_keys, faces)
+
+	def to_quad_mesh(self, cls=None):
+		"""Convert the snapshot into an editable quad mesh with the same keys.
+
+		Parameters
+		----------
+		cls : type, optional
+			The quad mesh type.
+			Default is QuadMesh.
+
+		Returns
+		-------
+		QuadMesh
+			The quad mesh.
+
+		"""
+
+		if cls is None:
+			cls = QuadMesh
+
+		mesh = cls()
+		for vkey, (x, y, z) in zip(self.vertex_keys, self.xyz.tolist()):
+			mesh.add_vertex(key=vkey, attr_dict={'x': x, 'y': y, 'z': z})
+		for fkey in self.face_keys:
+			mesh.add_face(self.face_vertex_keys(fkey), fkey=fkey)
+		return mesh
+
+	# --------------------------------------------------------------------------
+	# elements
+	# --------------------------------------------------------------------------
+
+	def number_of_vertices(self):
+		return len(self.vertex_keys)
+
+	def number_of_faces(self):
+		return len(self.face_keys)
+
+	def number_of_edges(self):
+		return len(self.edges())
+
+	def face_vertex_keys(self, fkey):
+		"""Return the vertex keys of a face.
+
+		Parameters
+		----------
+		fkey : hashable
+			A face key.
+
+		Returns
+		-------
+		list
+			The vertex keys.
+
+		"""
+
+		i = self.fkey_index[fkey]
+		return [self.vertex_keys[j] for j in self.face_vertices[self.face_offsets[i] : self.face_offsets[i + 1]].tolist()]
+
+	def edges(self):
+		"""Return the edges, as pairs of vertex indices.
+
+		Returns
+		-------
+		array
+			The (m, 2) array of the start and end vertex indices of the edges.
+
+		"""
+
+		import numpy as np
+
+		h = np.arange(len(self.halfedge_twin))
+		unique = (self.halfedge_twin == -1) | (h < self.halfedge_twin)
+		return np.column_stack((self.halfedge_start[unique], self.halfedge_end[unique]))
+
+	# --------------------------------------------------------------------------
+	# geometry
+	# --------------------------------------------------------------------------
+
+	def face_centroids(self):
+		"""Compute the face centroids.
+
+		Returns
+		-------
+		array
+			The (f, 3) array of the face centroids.
+
+		"""
+
+		import numpy as np
+
+		counts = np.diff(self.face_offsets)
+		return np.add.reduceat(self.xyz[self.face_vertices], self.face_offsets[:-1], axis=0) / counts[:, np.newaxis]
+
+	def edge_lengths(self):
+		"""Compute the edge lengths, in the order of the edges.
+
+		Returns
+		-------
+		array
+			The array of the edge lengths.
+
+		"""
+
+		import numpy as np
+
+		edges = self.edges()
+		return np.linalg.norm(self.xyz[edges[:, 1]] - self.xyz[edges[:, 0]], axis=1)
+
+	# --------------------------------------------------------------------------
+	# vertex topology
+	# --------------------------------------------------------------------------
+
+	def vertex_degrees(self):
+		"""Compute the vertex degrees.
+
+		Returns
+		-------
+		array
+			The array of the vertex degrees.
+
+		"""
+
+		import numpy as np
+
+		n = len(self.vertex_keys)
+		boundary = self.halfedge_twin == -1
+		return np.bincount(self.halfedge_start, minlength=n) + np.bincount(self.halfedge_end[boundary], minlength=n)
+
+	def vertex_boundary_mask(self):
+		"""Compute the boundary mask of the vertices.
+
+		Returns
+		-------
+		array
+			The boolean array, True for the vertices on the boundary.
+
+		"""
+
+		import numpy as np
+
+		mask = np.zeros(len(self.vertex_keys), dtype=bool)
+		mask[self.halfedge_end[self.halfedge_twin == -1]] = True
+		return mask
+
+	def singularities(self):
+		"""Return the singularities, as the vertices with a degree different from 4 inside and 3 on the boundary.
+
+		Returns
+		-------
+		list
+			The keys of the singularities.
+
+		"""
+
+		import numpy as np
+
+		regular = np.where(self.vertex_boundary_mask(), 3, 4)
+		return [self.vertex_keys[i] for i in np.nonzero(self.vertex_degrees() != regular)[0].tolist()]
+
+	def boundaries(self):
+		"""Collect the boundaries as loops of vertices.
+
+		Returns
+		-------
+		list
+			The boundaries as lists of vertex keys.
+
+		"""
+
+		import numpy as np
+
+		start = self.halfedge_start.tolist()
+		end = self.halfedge_end.tolist()
+
+		# boundary halfedge of the faces ending at each boundary vertex
+		into = {end[h]: h for h in np.nonzero(self.halfedge_twin == -1)[0].tolist()}
+
+		boundaries = []
+		visited = set()
+		for h0 in sorted(into.values()):
+			if h0 in visited:
+				continue
+			boundary = []
+			h = h0
+			while h not in visited:
+				visited.add(h)
+				boundary.append(self.vertex_keys[end[h]])
+				h = into[start[h]]
+			boundaries.append(boundary)
+		return boundaries
+
+	# --------------------------------------------------------------------------
+	# strips and polyedges
+	# --------------------------------------------------------------------------
+
+	def _strip_walk(self, h0, nxt, twin):
+		# walk accross the faces from a halfedge until the boundary or back to the start
+		halfedges = [h0]
+		while True:
+			o = nxt[nxt[halfedges[-1]]]
+			t = twin[o]
+			if t == h0:
+				return halfedges, None
+			if t == -1:
+				return halfedges, o
+			halfedges.append(t)
+
+	def strips(self):
+		"""Collect the strips of the quad mesh.
+
+		Returns
+		-------
+		list
+			The strips, as lists of edges (u, v) given as vertex keys.
+			The halfedge (u, v) of an edge points to the next face of the strip,
+			except for the last edge of an open strip, which is on the boundary.
+
+		"""
+
+		if self._strips is None:
+			start = self.halfedge_start.tolist()
+			end = self.halfedge_end.tolist()
+			nxt = self.halfedge_next.tolist()
+			twin = self.halfedge_twin.tolist()
+			keys = self.vertex_keys
+
+			self._strips = []
+			visited = set()
+			for h0 in reversed(range(len(start))):
+				if h0 in visited:
+					continue
+				halfedges, last = self._strip_walk(h0, nxt, twin)
+				if last is not None:
+					# restart from the first boundary reached, to cover the strip from end to end
+					halfedges, last = self._strip_walk(last, nxt, twin)
+				edges = [(keys[start[h]], keys[end[h]]) for h in halfedges]
+				if last is not None:
+					edges.append((keys[end[last]], keys[start[last]]))
+					visited.add(last)
+				for h in halfedges:
+					visited.add(h)
+					visited.add(twin[h])
+				self._strips.append(edges)
+
+		return [list(edges) for edges in self._strips]
+
+	def _vertex_opposite_vertex(self, u, v, degrees, boundary, outgoing, incoming, nxt, twin, end, start):
+		# opposite vertex to u accross v, as in QuadMesh.vertex_opposite_vertex
+		if degrees[v] != (3 if boundary[v] else 4):
+			return None
+		elif boundary[v]:
+			if not boundary[u]:
+				return None
+			nbrs = [end[h] for h in outgoing[v] if twin[h] == -1] + [start[h] for h in incoming[v] if twin[h] == -1]
+			nbrs = [nbr for nbr in nbrs if nbr != u]
+			return nbrs[0] if len(nbrs) > 0 else None
+		else:
+			h = [h for h in incoming[v] if start[h] == u][0]
+			return end[nxt[twin[nxt[h]]]]
+
+	def polyedges(self):
+		"""Collect the polyedges accross the regular vertices between boundaries and/or singularities.
+
+		Returns
+		-------
+		list
+			The polyedges as lists of vertex keys.
+
+		"""
+
+		if self._polyedges is None:
+			start = self.halfedge_start.tolist()
+			end = self.halfedge_end.tolist()
+			nxt = self.halfedge_next.tolist()
+			twin = self.halfedge_twin.tolist()
+			degrees = self.vertex_degrees().tolist()
+			boundary = self.vertex_boundary_mask().tolist()
+
+			# outgoing and incoming halfedges of the vertices
+			n = len(self.vertex_keys)
+			outgoing = [[] for _ in range(n)]
+			incoming = [[] for _ in range(n)]
+			for h, (u, v) in enumerate(zip(start, end)):
+				outgoing[u].append(h)
+				incoming[v].append(h)
+
+			args = (degrees, boundary, outgoing, incoming, nxt, twin, end, start)
+
+			self._polyedges = []
+			visited = set()
+			for u0, v0 in self.edges().tolist():
+				if (u0, v0) in visited:
+					continue
+				polyedge = [u0, v0]
+				while len(polyedge) <= n:
+					if polyedge[0] == polyedge[-1]:
+						break
+					w = self._vertex_opposite_vertex(polyedge[-2], polyedge[-1], *args)
+					if w is None:
+						polyedge = list(reversed(polyedge))
+						w = self._vertex_opposite_vertex(polyedge[-2], polyedge[-1], *args)
+						if w is None:
+							break
+					polyedge.append(w)
+				for u, v in zip(polyedge[:-1], polyedge[1:]):
+					visited.add((u, v))
+					visited.add((v, u))
+				self._polyedges.append([self.vertex_keys[vkey] for vkey in polyedge])
+
+		return [list(polyedge) for polyedge in self._polyedges]
+
+
+# ==============================================================================
+# Main
+# ==============================================================================
+
+if __name__ == '__main__':
+
+	vertices = [[float(i), float(j), 0.0] for j in range(4) for i in range(4)]
+	faces = [[j * 4 + i, j * 4 + i + 1, (j + 1) * 4 + i + 1, (j + 1) * 4 + i] for j in range(3) for i in range(3)]
+	mesh = QuadMesh.from_vertices_and_faces(vertices, faces)
+
+	snapshot = QuadMeshArray.from_quad_mesh(mesh)
+	print(snapshot.strips())
+	print(snapshot.polyedges())
+	print(snapshot.singularities())
+	print(snapshot.boundaries())
+	print(snapshot.face_centroids())
+	print(snapshot.edge_lengths())
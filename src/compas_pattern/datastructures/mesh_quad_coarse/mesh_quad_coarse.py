@@ -1,16 +1,16 @@
 from math import floor
 from math import ceil
 
-from compas_pattern.datastructures.network.network import Network
-from compas_pattern.datastructures.mesh.mesh import Mesh
+from array import array
+
 from compas_pattern.datastructures.mesh_quad.mesh_quad import QuadMesh
 
-from compas.datastructures.mesh import meshes_join_and_weld
-from compas.datastructures.mesh import mesh_weld
+from compas_pattern.geometry.resampling import resample_polylines
+from compas_pattern.geometry.resampling import resample_polylines_numpy
 
-from compas.topology import connected_components
+from compas_pattern.utilities.union_find import union_find_groups
 
-from compas.geometry import Polyline
+from compas.datastructures.mesh import mesh_weld
 
 from compas.geometry import discrete_coons_patch
 
@@ -30,12 +30,12 @@ class CoarseQuadMesh(QuadMesh):
 
 	def __init__(self):
 		super(CoarseQuadMesh, self).__init__()
-		
+
 		self.vertex_to_vertex = {}
 		self.edge_to_polyedge = {}
 
 		self.strip_data = {}
-		
+
 		self.quad_mesh = None
 		self.polygonal_mesh = None
 
@@ -63,24 +63,18 @@ class CoarseQuadMesh(QuadMesh):
 		polyedges = quad_mesh.singularity_polyedge_decomposition()
 
 		# vertex data
-		vertices = {vkey: quad_mesh.vertex_coordinates(vkey) for vkey in quad_mesh.vertices()}
 		coarse_vertices_children = {vkey: vkey for polyedge in polyedges for vkey in [polyedge[0], polyedge[-1]]}
 		coarse_vertices = {vkey: quad_mesh.vertex_coordinates(vkey) for vkey in coarse_vertices_children}
 
 		# edge data
 		coarse_edges_children = {(polyedge[0], polyedge[-1]): polyedge for polyedge in polyedges}
 		#print coarse_edges_children
-		singularity_edges = [(x, y) for polyedge in polyedges for u, v in pairwise(polyedge) for x, y in [(u, v), (v, u)]]
+		singularity_edges = set([(x, y) for polyedge in polyedges for u, v in pairwise(polyedge) for x, y in [(u, v), (v, u)]])
 
 		# face data
-		faces = {fkey: quad_mesh.face_vertices(fkey) for fkey in quad_mesh.faces()}
-		network_vertices = {fkey: quad_mesh.face_centroid(fkey) for fkey in quad_mesh.faces()}
-		network_edges = {(f1, f2) for f1 in quad_mesh.faces() for f2 in quad_mesh.face_neighbors(f1) if f1 < f2 and quad_mesh.face_adjacency_halfedge(f1, f2) not in singularity_edges}
-		network = Network.from_vertices_and_edges(network_vertices, network_edges)
-		coarse_faces_children = {}
-		for i, connected_faces in enumerate(connected_components(network.adjacency)):
-			mesh = Mesh.from_vertices_and_faces(vertices, [faces[face] for face in connected_faces])
-			coarse_faces_children[i] = [vkey for vkey in reversed(mesh.boundaries()[0]) if mesh.vertex_degree(vkey) == 2]
+		faces = list(quad_mesh.faces())
+		adjacency = [(fkey, quad_mesh.halfedge[v][u]) for fkey in faces for u, v in quad_mesh.face_halfedges(fkey) if (u, v) not in singularity_edges and quad_mesh.halfedge[v][u] is not None]
+		coarse_faces_children = {i: _patch_corners(quad_mesh, patch) for i, patch in enumerate(union_find_groups(faces, adjacency))}
 
 		# coarse quad mesh
 		coarse_quad_mesh = cls.from_vertices_and_faces(coarse_vertices, coarse_faces_children)
@@ -105,7 +99,7 @@ class CoarseQuadMesh(QuadMesh):
 
 		coarse_quad_mesh.quad_mesh = quad_mesh
 		coarse_quad_mesh.polygonal_mesh = quad_mesh.copy()
-		
+
 		return coarse_quad_mesh
 
 	# --------------------------------------------------------------------------
@@ -181,7 +175,7 @@ class CoarseQuadMesh(QuadMesh):
 			A density parameter.
 		skeys : list, None
 			The keys of strips to set density. If is None, all strips are considered.
-		
+
 		"""
 
 		if skeys is None:
@@ -237,15 +231,183 @@ class CoarseQuadMesh(QuadMesh):
 			n = int(ceil(n))
 		self.set_strips_density(n)
 
+	def strips_width_numpy(self):
+		"""Compute the mean width of each strip, as the mean length of its non-collapsed edges, from a coordinate array in one pass.
+
+		Returns
+		-------
+		dict
+			The mean width of each strip.
+
+		Notes
+		-----
+		Requires numpy.
+
+		"""
+
+		import numpy as np
+
+		key_index = self.key_index()
+		xyz = np.array([self.vertex_coordinates(vkey) for vkey in self.vertices()], dtype=float).reshape((-1, 3))
+
+		strips = list(self.strips())
+		edges = [(i, key_index[u], key_index[v]) for i, skey in enumerate(strips) for u, v in self.strip_edges(skey) if u != v]
+		if len(edges) == 0:
+			return {skey: 0.0 for skey in strips}
+
+		index, start, end = np.array(edges, dtype=int).T
+		lengths = np.sqrt(np.sum((xyz[end] - xyz[start]) ** 2, axis=1))
+		counts = np.bincount(index, minlength=len(strips))
+		widths = np.bincount(index, weights=lengths, minlength=len(strips)) / np.maximum(counts, 1)
+
+		return {skey: float(width) for skey, width in zip(strips, widths)}
+
+	def set_strips_density_face_target_numpy(self, nb_faces, t=None):
+		"""Set the strip densities proportionally to the strip widths, so that the number of faces of the denser quad mesh is as close as possible to a target number, without exceeding it.
+
+		The densities are first rounded down from the continuous solution, then incremented one by one,
+		the strip with the largest relative deficit first, as long as the number of faces does not exceed the target.
+		Unless the minimum densities already exceed the target, the number of faces ends between the target
+		minus the face increment of the cheapest strip and the target.
+
+		Parameters
+		----------
+		nb_faces : int
+			The target number of faces.
+		t : float, dict, None
+			A target length, or a dictionary of target lengths per strip, as maximum length of the edges across the strips.
+			The densities are not set below the ones of the target lengths, even if the target number of faces is exceeded.
+			Default is None.
+
+		Returns
+		-------
+		int
+			The number of faces of the denser quad mesh.
+
+		Notes
+		-----
+		Requires numpy.
+
+		"""
+
+		import numpy as np
+		from heapq import heapify
+		from heapq import heappush
+		from heapq import heappop
+
+		strips = list(self.strips())
+		sindex = {skey: i for i, skey in enumerate(strips)}
+		widths_dict = self.strips_width_numpy()
+		widths = np.array([widths_dict[skey] for skey in strips], dtype=float)
+
+		# the densities of the faces of the denser quad mesh are the products of the densities of their two strips
+		pairs = np.array([[sindex[skey] for skey in self.face_strips(fkey)] for fkey in self.faces()], dtype=int).reshape((-1, 2))
+		strip_faces = [[] for skey in strips]
+		for i, j in pairs:
+			strip_faces[i].append(j)
+			if i != j:
+				strip_faces[j].append(i)
+
+		minimum = np.ones(len(strips), dtype=int)
+		if t is not None:
+			targets = np.array([t.get(skey, np.inf) if isinstance(t, dict) else t for skey in strips], dtype=float)
+			minimum = np.maximum(minimum, np.ceil(widths / targets).astype(int))
+
+		# continuous densities proportional to the widths, giving the target number of faces
+		area = np.sum(widths[pairs[:, 0]] * widths[pairs[:, 1]])
+		scale = (float(nb_faces) / area) ** .5 if area > 0 else 0.
+		goal = widths * scale
+		density = np.maximum(minimum, np.floor(goal).astype(int))
+
+		faces = int(np.sum(density[pairs[:, 0]] * density[pairs[:, 1]]))
+
+		def increment(i):
+			# faces crossed twice by a strip count (d + 1) ** 2 - d ** 2 = 2 * d + 1 more faces
+			return sum([density[j] if j != i else 2 * density[i] + 1 for j in strip_faces[i]])
+
+		heap = [(density[i] / goal[i], i) for i in range(len(strips)) if goal[i] > 0]
+		heapify(heap)
+		while heap:
+			ratio, i = heappop(heap)
+			delta = increment(i)
+			# the increments only grow, so a strip that does not fit any more is discarded
+			if faces + delta > nb_faces:
+				continue
+			density[i] += 1
+			faces += delta
+			heappush(heap, (density[i] / goal[i], i))
+
+		for skey, d in zip(strips, density):
+			self.set_strip_density(skey, int(d))
+
+		return faces
+
 	# --------------------------------------------------------------------------
 	# densification
 	# --------------------------------------------------------------------------
 
+	def densification_preview(self, vertex_bytes=760, face_bytes=510):
+		"""Preview the size of the denser quad mesh from the strip densities, without generating it.
+
+		Parameters
+		----------
+		vertex_bytes : int, optional
+			The estimated memory of a vertex of the denser quad mesh, with its attributes and halfedges.
+			Default is 760 bytes, measured for quad meshes with CPython 2.7 on 64 bits.
+		face_bytes : int, optional
+			The estimated memory of a face of the denser quad mesh, with its attributes.
+			Default is 510 bytes, measured for quad meshes with CPython 2.7 on 64 bits.
+
+		Returns
+		-------
+		dict
+			'vertices', 'edges' and 'faces': the numbers of vertices, edges and faces;
+			'triangles': the number of faces collapsed at poles, included in the faces;
+			'memory': the estimated memory of the denser quad mesh, in bytes;
+			'memory_numpy': the memory of its vertex coordinates and faces as numpy arrays of floats and integers, in bytes.
+
+		"""
+
+		vertices = self.number_of_vertices()
+		edges = 0
+		faces = 0
+		triangles = 0
+
+		edge_density = {}
+		for u, v in self.edges():
+			d = self.get_strip_density(self.edge_strip((u, v)))
+			edge_density[(u, v)] = edge_density[(v, u)] = d
+			vertices += d - 1
+			edges += d
+
+		for fkey in self.faces():
+			ab, bc, cd, da = self.densification_face_sides(fkey, edge_density)
+			n = ab if ab is not None else cd
+			m = bc if bc is not None else da
+			vertices += (n - 1) * (m - 1)
+			edges += n * (m - 1) + m * (n - 1)
+			faces += n * m
+			if ab is None or cd is None:
+				triangles += n
+			elif bc is None or da is None:
+				triangles += m
+
+		return {
+			'vertices': vertices,
+			'edges': edges,
+			'faces': faces,
+			'triangles': triangles,
+			'memory': vertices * vertex_bytes + faces * face_bytes,
+			'memory_numpy': vertices * 3 * 8 + (faces - triangles) * 4 * 8 + triangles * 3 * 8,
+		}
+
 	def geometrical_densification(self):
-		"""Generate a denser quad mesh from the coarse quad mesh and its strip densities.
-	
-		WIP!
-		
+		"""Generate a denser quad mesh from the coarse quad mesh and its strip densities, following the polyedges of the current quad mesh.
+
+		The points along each coarse edge are resampled by arc length along its polyedge in the current quad mesh,
+		and the patches of the coarse faces are stitched topologically.
+		The quad mesh and the maps from the coarse vertices and edges to its vertices and polyedges are updated.
+
 		Returns
 		-------
 		QuadMesh
@@ -253,6 +415,26 @@ class CoarseQuadMesh(QuadMesh):
 
 		"""
 
+		return self._geometrical_densification()
+
+	def geometrical_densification_numpy(self):
+		"""Generate a denser quad mesh from the coarse quad mesh and its strip densities, following the polyedges of the current quad mesh, with all the polyedges resampled at once and the Coons patches evaluated in numpy.
+
+		Returns
+		-------
+		QuadMesh
+			A denser quad mesh.
+
+		Notes
+		-----
+		Requires numpy.
+
+		"""
+
+		return self._geometrical_densification(vectorized=True)
+
+	def _geometrical_densification(self, vectorized=False):
+
 		if self.quad_mesh is None:
 			self.quad_mesh = self.copy()
 			self.polygonal_mesh = self.copy()
@@ -264,89 +446,628 @@ class CoarseQuadMesh(QuadMesh):
 				self.edge_to_polyedge[v][u] = (v, u)
 
 		quad_mesh = self.quad_mesh
-	
-		new_edge_polyline = {}
 
+		edge_keys, face_grids, number_of_vertices = self.densification_grids()
+
+		edges = list(self.edges())
+		polylines = [[quad_mesh.vertex_coordinates(vkey) for vkey in self.edge_to_polyedge[u][v]] for u, v in edges]
+		parameters = [[float(i) / float(len(edge_keys[edge]) - 1) for i in range(len(edge_keys[edge]))] for edge in edges]
+
+		vkeys = [vkey for edge in edges for vkey in edge_keys[edge]]
+		if vectorized:
+			import numpy as np
+			xyz = np.zeros((number_of_vertices, 3))
+			xyz[vkeys] = resample_polylines_numpy(polylines, parameters)
+			xyz = self.densification_patches_xyz_numpy(face_grids, xyz).tolist()
+		else:
+			xyz = [None] * number_of_vertices
+			points = [point for polyline in resample_polylines(polylines, parameters) for point in polyline]
+			for vkey, point in zip(vkeys, points):
+				xyz[vkey] = point
+			xyz = self.densification_patches_xyz(face_grids, xyz)
+
+		faces = []
+		for fkey in self.faces():
+			grid = face_grids[fkey]
+			n, m = len(grid), len(grid[0])
+			faces += [[grid[i][j], grid[i][j + 1], grid[i + 1][j + 1], grid[i + 1][j]] for i in range(n - 1) for j in range(m - 1)]
+
+		self.quad_mesh = QuadMesh.from_vertices_and_faces(xyz, faces)
+
+		self.vertex_to_vertex = {vkey: i for i, vkey in enumerate(self.vertices())}
+		self.edge_to_polyedge = {vkey: {} for vkey in self.vertices()}
+		for u, v in edges:
+			self.edge_to_polyedge[u][v] = edge_keys[(u, v)]
+			self.edge_to_polyedge[v][u] = edge_keys[(v, u)]
+
+		return self.quad_mesh
+
+	def densification_face_sides(self, fkey, edge_data):
+		"""Return the data along the sides of a coarse face, such as the vertex keys of the denser quad mesh.
+
+		Parameters
+		----------
+		fkey : hashable
+			A face key.
+		edge_data : dict
+			The data of each coarse halfedge, such as the vertex keys along it or its density.
+
+		Returns
+		-------
+		list
+			The data of the four face halfedges, in the order of the face halfedges.
+			A side is None if it is collapsed.
+
+		"""
+
+		return [edge_data[edge] for edge in self.face_halfedges(fkey)]
+
+	def densification_face_grid(self, fkey, edge_keys, k):
+		"""Return the grid of vertex keys of the denser quad mesh on a coarse face.
+
+		Parameters
+		----------
+		fkey : hashable
+			A face key.
+		edge_keys : dict
+			The vertex keys along each coarse edge, for both orientations.
+		k : int
+			The first key of the vertices inside the face, which are numbered row by row.
+
+		Returns
+		-------
+		list
+			The grid of vertex keys, as rows ordered like the points of discrete_coons_patch.
+			A collapsed side of the face repeats the key of the vertex it collapses to.
+
+		"""
+
+		ab, bc, cd, da = self.densification_face_sides(fkey, edge_keys)
+		dc = list(reversed(cd)) if cd is not None else None
+		ad = list(reversed(da)) if da is not None else None
+		# collapsed sides as in discrete_coons_patch
+		if not ab:
+			ab = [ad[0]] * len(dc)
+		if not bc:
+			bc = [ab[-1]] * len(ad)
+		if not dc:
+			dc = [bc[-1]] * len(ab)
+		if not ad:
+			ad = [dc[0]] * len(bc)
+		n, m = len(ab), len(bc)
+		grid = [[None] * m for i in range(n)]
+		for i in range(n):
+			grid[i][0] = ab[i]
+			grid[i][m - 1] = dc[i]
+		for j in range(m):
+			grid[0][j] = ad[j]
+			grid[n - 1][j] = bc[j]
+		for i in range(1, n - 1):
+			grid[i][1 : m - 1] = list(range(k, k + m - 2))
+			k += m - 2
+		return grid
+
+	def densification_grids(self):
+		"""Allocate the vertex keys of the denser quad mesh, once per coarse vertex, once per interior point of coarse edge and once per interior point of coarse face.
+
+		Returns
+		-------
+		edge_keys : dict
+			The vertex keys along each coarse edge, for both orientations.
+		face_grids : dict
+			The grid of vertex keys of each coarse face, as rows ordered like the points of discrete_coons_patch.
+			A collapsed side of the face repeats the key of the vertex it collapses to.
+		number_of_vertices : int
+			The number of vertices of the denser quad mesh.
+
+		"""
+
+		vertex_keys = {vkey: i for i, vkey in enumerate(self.vertices())}
+		k = len(vertex_keys)
+
+		edge_keys = {}
 		for u, v in self.edges():
-			d =  self.get_strip_density(self.edge_strip((u, v)))
-			old_polyline = Polyline([quad_mesh.vertex_coordinates(vkey) for vkey in self.edge_to_polyedge[u][v]])
-			new_polyline = [old_polyline.point(float(i) / float(d)) for i in range(0, d + 1)]
-			new_edge_polyline[(u, v)] = new_polyline
-			new_edge_polyline[(v, u)] = list(reversed(new_polyline))
+			d = self.get_strip_density(self.edge_strip((u, v)))
+			polyedge = [vertex_keys[u]] + list(range(k, k + d - 1)) + [vertex_keys[v]]
+			k += d - 1
+			edge_keys[(u, v)] = polyedge
+			edge_keys[(v, u)] = list(reversed(polyedge))
+
+		face_grids = {}
+		for fkey in self.faces():
+			face_grids[fkey] = self.densification_face_grid(fkey, edge_keys, k)
+			k += (len(face_grids[fkey]) - 2) * (len(face_grids[fkey][0]) - 2)
+
+		return edge_keys, face_grids, k
+
+	def densification_xyz(self, edge_keys, face_grids, number_of_vertices):
+		"""Compute the vertex coordinates of the denser quad mesh, with one Coons patch per coarse face.
+
+		Parameters
+		----------
+		edge_keys : dict
+			The vertex keys along each coarse edge, for both orientations.
+		face_grids : dict
+			The grid of vertex keys of each coarse face.
+		number_of_vertices : int
+			The number of vertices of the denser quad mesh.
+
+		Returns
+		-------
+		list
+			The vertex coordinates, in the order of the vertex keys.
+
+		"""
 
-		meshes = []
+		return self.densification_patches_xyz(face_grids, self.densification_edges_xyz(edge_keys, number_of_vertices))
 
-		new_edge_polyedge = {}
-		new_vertex_vertex = {}
+	def densification_xyz_parallel(self, edge_keys, face_grids, number_of_vertices, workers=None):
+		"""Compute the vertex coordinates of the denser quad mesh, with the Coons patches of the coarse faces distributed over a pool of processes.
 
-		for i, fkey in enumerate(self.faces()):
-			ab, bc, cd, da = [new_edge_polyline[edge] for edge in self.face_halfedges(fkey)]
+		Parameters
+		----------
+		edge_keys : dict
+			The vertex keys along each coarse edge, for both orientations.
+		face_grids : dict
+			The grid of vertex keys of each coarse face.
+		number_of_vertices : int
+			The number of vertices of the denser quad mesh.
+		workers : int, optional
+			The number of processes. Default is the number of CPUs.
 
-			a, b, c, d = self.face_vertices(fkey)
-			n, m = len(ab), len(bc)
-			vertices, faces = discrete_coons_patch(ab, bc, list(reversed(cd)), list(reversed(da)))
-			meshes.append(QuadMesh.from_vertices_and_faces(vertices, faces))
-			ab, bc, cd, da = list(self.face_halfedges(fkey))
+		Returns
+		-------
+		list
+			The vertex coordinates, in the order of the vertex keys.
 
-			new_edge_polyedge[ab] = [i, range(0, m)]
-			new_edge_polyedge[tuple(reversed(ab))] = [new_edge_polyedge[ab][0], list(reversed(new_edge_polyedge[ab][1]))]
+		Notes
+		-----
+		Requires multiprocessing. The processes receive the points along the sides of the faces
+		and send back the points inside the faces as flat arrays of floats.
 
-			new_edge_polyedge[bc] = [i, range(m - 1, n * m, m)]
-			new_edge_polyedge[tuple(reversed(bc))] = [new_edge_polyedge[bc][0], list(reversed(new_edge_polyedge[bc][1]))]
+		"""
 
-			new_edge_polyedge[cd] = [i, list(reversed(range((n - 1) * m, n * m)))]
-			new_edge_polyedge[tuple(reversed(cd))] = [new_edge_polyedge[cd][0], list(reversed(new_edge_polyedge[cd][1]))]
+		from multiprocessing import Pool
+		from multiprocessing import cpu_count
 
-			new_edge_polyedge[da] = [i, list(reversed(range(0, (n - 1) * m + 1, m)))]
-			new_edge_polyedge[tuple(reversed(da))] = [new_edge_polyedge[da][0], list(reversed(new_edge_polyedge[da][1]))]
+		if workers is None:
+			workers = cpu_count()
 
-			new_vertex_vertex[a] = (new_edge_polyedge[ab][0], new_edge_polyedge[ab][1][0])
-			new_vertex_vertex[b] = (new_edge_polyedge[ab][0], new_edge_polyedge[ab][1][-1])
-			new_vertex_vertex[c] = (new_edge_polyedge[cd][0], new_edge_polyedge[cd][1][0])
-			new_vertex_vertex[d] = (new_edge_polyedge[cd][0], new_edge_polyedge[cd][1][-1])
-	
-		self.quad_mesh, old_to_new_vertices = meshes_join_and_weld(meshes, data = True)
+		xyz = self.densification_edges_xyz(edge_keys, number_of_vertices)
+
+		# chunks of faces with balanced numbers of points inside
+		grids = [grid for grid in face_grids.values() if len(grid) > 2 and len(grid[0]) > 2]
+		size = max(1, sum([(len(grid) - 2) * (len(grid[0]) - 2) for grid in grids]) // (4 * workers))
+		chunks = [[]]
+		count = 0
+		for grid in grids:
+			if count >= size:
+				chunks.append([])
+				count = 0
+			chunks[-1].append(grid)
+			count += (len(grid) - 2) * (len(grid[0]) - 2)
+
+		tasks = [[([xyz[row[0]] for row in grid], [xyz[vkey] for vkey in grid[-1]], [xyz[row[-1]] for row in grid], [xyz[vkey] for vkey in grid[0]]) for grid in chunk] for chunk in chunks]
+
+		pool = Pool(workers)
+		try:
+			results = pool.map(_coons_patches_inside, tasks)
+		finally:
+			pool.close()
+			pool.join()
+
+		for chunk, points in zip(chunks, results):
+			k = 0
+			for grid in chunk:
+				for row in grid[1 : -1]:
+					for vkey in row[1 : -1]:
+						xyz[vkey] = [points[k], points[k + 1], points[k + 2]]
+						k += 3
+
+		return xyz
+
+	def densification_edges_xyz(self, edge_keys, number_of_vertices):
+		"""Compute the coordinates of the vertices of the denser quad mesh along the coarse edges.
+
+		Parameters
+		----------
+		edge_keys : dict
+			The vertex keys along each coarse edge, for both orientations.
+		number_of_vertices : int
+			The number of vertices of the denser quad mesh.
+
+		Returns
+		-------
+		list
+			The vertex coordinates, in the order of the vertex keys, None inside the coarse faces.
+
+		"""
 
-		self.vertex_to_vertex = {vkey: old_to_new_vertices[tuple(new_vertex_vertex[vkey])] for vkey in self.vertices()}
+		xyz = [None] * number_of_vertices
 
 		for u, v in self.edges():
-			i, vkeys = new_edge_polyedge[(u, v)]
-			new_polyedge = [old_to_new_vertices[(i, vkey)] for vkey in vkeys]
-			
-			if self.vertex_to_vertex[u] == new_polyedge[0]:
-				self.edge_to_polyedge[u][v] = new_polyedge
-				self.edge_to_polyedge[v][u] = list(reversed(new_polyedge))
-			
-			elif self.vertex_to_vertex[u] == new_polyedge[-1]:
-				self.edge_to_polyedge[u][v] = list(reversed(new_polyedge))
-				self.edge_to_polyedge[v][u] = new_polyedge
-			
-			else:
-				pass
+			polyedge = edge_keys[(u, v)]
+			d = len(polyedge) - 1
+			for i, vkey in enumerate(polyedge):
+				xyz[vkey] = self.edge_point(u, v, float(i) / float(d))
 
-		return self.quad_mesh
+		for i, vkey in enumerate(self.vertices()):
+			xyz[i] = self.vertex_coordinates(vkey)
+
+		return xyz
+
+	def densification_patches_xyz(self, face_grids, xyz):
+		"""Compute the coordinates of the vertices inside the coarse faces, with one Coons patch per coarse face on the points along its sides.
+
+		Parameters
+		----------
+		face_grids : dict
+			The grid of vertex keys of each coarse face.
+		xyz : list
+			The vertex coordinates, set along the coarse edges. The other ones are set in place.
+
+		Returns
+		-------
+		list
+			The vertex coordinates, in the order of the vertex keys.
+
+		"""
+
+		for fkey, grid in face_grids.items():
+			n, m = len(grid), len(grid[0])
+			if n < 3 or m < 3:
+				continue
+			ab = [xyz[row[0]] for row in grid]
+			bc = [xyz[vkey] for vkey in grid[-1]]
+			dc = [xyz[row[-1]] for row in grid]
+			ad = [xyz[vkey] for vkey in grid[0]]
+			patch_vertices, patch_faces = discrete_coons_patch(ab, bc, dc, ad)
+			for i in range(1, n - 1):
+				for j in range(1, m - 1):
+					xyz[grid[i][j]] = patch_vertices[i * m + j]
+
+		return xyz
+
+	def densification_xyz_numpy(self, edge_keys, face_grids, number_of_vertices):
+		"""Compute the vertex coordinates of the denser quad mesh, with the coarse edges resampled at once and the Coons patches evaluated in batches of faces with the same grid size.
+
+		Parameters
+		----------
+		edge_keys : dict
+			The vertex keys along each coarse edge, for both orientations.
+		face_grids : dict
+			The grid of vertex keys of each coarse face.
+		number_of_vertices : int
+			The number of vertices of the denser quad mesh.
+
+		Returns
+		-------
+		array
+			The (n, 3) array of the vertex coordinates, in the order of the vertex keys.
+
+		Notes
+		-----
+		Requires numpy.
+
+		"""
+
+		import numpy as np
+
+		key_index = self.key_index()
+		corners = np.array([self.vertex_coordinates(vkey) for vkey in self.vertices()], dtype=float).reshape((-1, 3))
+
+		xyz = np.zeros((number_of_vertices, 3))
 
-	def densification(self):
+		# resample the coarse edges
+		edges = list(self.edges())
+		if len(edges) > 0:
+			polyedges = [edge_keys[edge] for edge in edges]
+			sizes = np.array([len(polyedge) for polyedge in polyedges], dtype=int)
+			vkeys = np.array([vkey for polyedge in polyedges for vkey in polyedge], dtype=int)
+			starts = np.repeat(corners[[key_index[u] for u, v in edges]], sizes, axis=0)
+			ends = np.repeat(corners[[key_index[v] for u, v in edges]], sizes, axis=0)
+			t = (np.arange(len(vkeys)) - np.repeat(np.cumsum(sizes) - sizes, sizes)) / np.repeat(sizes - 1, sizes).astype(float)
+			xyz[vkeys] = starts + t[:, np.newaxis] * (ends - starts)
+
+		xyz[: len(corners)] = corners
+
+		return self.densification_patches_xyz_numpy(face_grids, xyz)
+
+	def densification_patches_xyz_numpy(self, face_grids, xyz):
+		"""Compute the coordinates of the vertices inside the coarse faces, with the Coons patches of the faces with the same grid size evaluated together.
+
+		Parameters
+		----------
+		face_grids : dict
+			The grid of vertex keys of each coarse face.
+		xyz : array
+			The (n, 3) array of vertex coordinates, set along the coarse edges. The other ones are set in place.
+
+		Returns
+		-------
+		array
+			The (n, 3) array of the vertex coordinates, in the order of the vertex keys.
+
+		Notes
+		-----
+		Requires numpy.
+
+		"""
+
+		import numpy as np
+
+		# evaluate the patches of the faces with the same grid size together
+		batches = {}
+		for fkey, grid in face_grids.items():
+			n, m = len(grid), len(grid[0])
+			if n > 2 and m > 2:
+				batches.setdefault((n, m), []).append(grid)
+
+		for (n, m), grids in batches.items():
+			grids = np.array(grids, dtype=int)
+			ab = xyz[grids[:, :, 0]][:, :, np.newaxis, :]
+			dc = xyz[grids[:, :, -1]][:, :, np.newaxis, :]
+			ad = xyz[grids[:, 0, :]][:, np.newaxis, :, :]
+			bc = xyz[grids[:, -1, :]][:, np.newaxis, :, :]
+			a, b, c, d = ab[:, :1], bc[:, :, :1], dc[:, -1:], ad[:, :, -1:]
+			ki = np.linspace(0.0, 1.0, n)[np.newaxis, :, np.newaxis, np.newaxis]
+			kj = np.linspace(0.0, 1.0, m)[np.newaxis, np.newaxis, :, np.newaxis]
+			patches = (1 - kj) * ab + kj * dc + (1 - ki) * ad + ki * bc - ((1 - ki) * (1 - kj) * a + ki * (1 - kj) * b + ki * kj * c + (1 - ki) * kj * d)
+			xyz[grids[:, 1 : -1, 1 : -1]] = patches[:, 1 : -1, 1 : -1]
+
+		return xyz
+
+	def densification(self, parallel=False, workers=None):
 		"""Generate a denser quad mesh from the coarse quad mesh and its strip densities.
 
+		The patches of the coarse faces are stitched topologically: the vertices shared along coarse edges and at coarse vertices are allocated once, without welding.
+		As long as the coarse topology does not change, the points inside a coarse face are only computed again
+		if the coordinates of its vertices or the densities of its sides changed since the previous densification.
+		A new quad mesh is built each time.
+
+		Parameters
+		----------
+		parallel : bool, optional
+			Whether to compute the patches of the coarse faces in a pool of processes, for large densities.
+			Default is False.
+		workers : int, optional
+			The number of processes if parallel. Default is the number of CPUs.
+
+		Returns
+		-------
+		QuadMesh
+			A denser quad mesh.
+
+		"""
+
+		if parallel:
+			return self._densification(lambda *args: self.densification_xyz_parallel(*args, workers=workers))
+
+		return self._densification(self.densification_xyz)
+
+	def densification_numpy(self):
+		"""Generate a denser quad mesh from the coarse quad mesh and its strip densities, with the Coons patches evaluated in numpy.
+
 		Returns
 		-------
 		QuadMesh
 			A denser quad mesh.
 
+		Notes
+		-----
+		Requires numpy.
+
+		"""
+
+		return self._densification(lambda *args: self.densification_xyz_numpy(*args).tolist())
+
+	def densification_blocks(self):
+		"""Generate the denser quad mesh block by block, one block per coarse face, without building it.
+
+		Only the indices of the points along the coarse edges are kept from one block to the next,
+		so that the memory does not depend on the density.
+
+		Yields
+		------
+		tuple
+			The coordinates of the vertices added with the block and the faces of the block, as lists of vertex indices.
+			The indices are global: the vertices are numbered in the order they are yielded.
+
 		"""
 
-		meshes = []
+		vertex_index = {}
+		edge_index = {}
+		k = 0
 
 		for fkey in self.faces():
-			ab, bc, cd, da = [[self.edge_point(u, v, float(i) / float(self.get_strip_density(self.edge_strip((u, v))))) for i in range(0, self.get_strip_density(self.edge_strip((u, v))) + 1)] for u, v in self.face_halfedges(fkey)]
-			vertices, faces = discrete_coons_patch(ab, bc, list(reversed(cd)), list(reversed(da)))
-			meshes.append(QuadMesh.from_vertices_and_faces(vertices, faces))
+			vertices = []
+			xyz = {}
+
+			for vkey in self.face_vertices(fkey):
+				if vkey not in vertex_index:
+					vertex_index[vkey] = k
+					vertices.append(self.vertex_coordinates(vkey))
+					k += 1
+
+			# the points along an edge are numbered once, in the direction of the first face that yields them
+			edge_keys = {}
+			for u, v in self.face_halfedges(fkey):
+				d = self.get_strip_density(self.edge_strip((u, v)))
+				if (v, u) in edge_index:
+					polyline = [self.edge_point(v, u, float(i) / float(d)) for i in range(d, -1, -1)]
+					polyedge = [vertex_index[u]] + list(reversed(range(edge_index[(v, u)], edge_index[(v, u)] + d - 1))) + [vertex_index[v]]
+				else:
+					polyline = [self.edge_point(u, v, float(i) / float(d)) for i in range(0, d + 1)]
+					if (u, v) not in edge_index:
+						edge_index[(u, v)] = k
+						vertices += polyline[1 : -1]
+						k += d - 1
+					polyedge = [vertex_index[u]] + list(range(edge_index[(u, v)], edge_index[(u, v)] + d - 1)) + [vertex_index[v]]
+				edge_keys[(u, v)] = polyedge
+				for vkey, point in zip(polyedge, polyline):
+					xyz[vkey] = point
+
+			grid = self.densification_face_grid(fkey, edge_keys, k)
+			n, m = len(grid), len(grid[0])
+			if n > 2 and m > 2:
+				ab = [xyz[row[0]] for row in grid]
+				bc = [xyz[vkey] for vkey in grid[-1]]
+				dc = [xyz[row[-1]] for row in grid]
+				ad = [xyz[vkey] for vkey in grid[0]]
+				patch_vertices, patch_faces = discrete_coons_patch(ab, bc, dc, ad)
+				for i in range(1, n - 1):
+					vertices += patch_vertices[i * m + 1 : (i + 1) * m - 1]
+				k += (n - 2) * (m - 2)
+
+			faces = [[grid[i][j], grid[i][j + 1], grid[i + 1][j + 1], grid[i + 1][j]] for i in range(n - 1) for j in range(m - 1)]
+			# collapsed sides give faces with repeated vertices
+			faces = [[u for u, v in pairwise(face + face[:1]) if u != v] for face in faces]
+
+			yield vertices, faces
+
+	def densification_to_obj(self, filepath, precision='3f'):
+		"""Write the denser quad mesh to an OBJ file block by block, without building it.
 
-		self.quad_mesh = meshes_join_and_weld(meshes)
+		Parameters
+		----------
+		filepath : str
+			Full path of the file.
+		precision : str, optional
+			The precision of the vertex coordinates.
+			Default is '3f'.
+
+		Returns
+		-------
+		tuple
+			The number of vertices and faces written.
+
+		"""
 
+		vertex_format = 'v {0:.%s} {1:.%s} {2:.%s}\n' % (precision, precision, precision)
+
+		number_of_vertices = 0
+		number_of_faces = 0
+		with open(filepath, 'w+') as fh:
+			for vertices, faces in self.densification_blocks():
+				for x, y, z in vertices:
+					fh.write(vertex_format.format(x, y, z))
+				for face in faces:
+					fh.write(' '.join(['f'] + [str(index + 1) for index in face]) + '\n')
+				number_of_vertices += len(vertices)
+				number_of_faces += len(faces)
+
+		return number_of_vertices, number_of_faces
+
+	def _densification(self, densification_xyz):
+
+		edge_keys, face_grids, number_of_vertices = self.densification_grids()
+		vertices = self._densification_vertices(densification_xyz, edge_keys, face_grids, number_of_vertices)
+
+		faces = []
+		for fkey in self.faces():
+			grid = face_grids[fkey]
+			n, m = len(grid), len(grid[0])
+			faces += [[grid[i][j], grid[i][j + 1], grid[i + 1][j + 1], grid[i + 1][j]] for i in range(n - 1) for j in range(m - 1)]
+
+		self.quad_mesh = QuadMesh.from_vertices_and_faces(vertices, faces)
 		return self.quad_mesh
 
+	def _densification_vertices(self, densification_xyz, edge_keys, face_grids, number_of_vertices):
+		"""Compute the vertex coordinates of the denser quad mesh, reusing the points inside the coarse faces with the same inputs as in a previous densification."""
+
+		# the points inside the faces are kept for the current coarse topology, with the corner coordinates and the side densities they were computed from
+		patches = self.cached('densification', dict)
+		inputs = {}
+		for fkey in self.faces():
+			xyz = tuple([tuple(self.vertex_coordinates(vkey)) for vkey in self.face_vertices(fkey)])
+			densities = tuple([len(side) - 1 if side else 0 for side in self.densification_face_sides(fkey, edge_keys)])
+			inputs[fkey] = (xyz, densities)
+
+		modified = {fkey: grid for fkey, grid in face_grids.items() if fkey not in patches or patches[fkey][0] != inputs[fkey]}
+		vertices = densification_xyz(edge_keys, modified, number_of_vertices)
+
+		for fkey, grid in face_grids.items():
+			if fkey in modified:
+				patches[fkey] = (inputs[fkey], [vertices[vkey] for row in grid[1 : -1] for vkey in row[1 : -1]])
+			else:
+				points = iter(patches[fkey][1])
+				for row in grid[1 : -1]:
+					for vkey in row[1 : -1]:
+						vertices[vkey] = next(points)
+
+		return vertices
+
+def _coons_patches_inside(sides):
+	"""Compute the points inside Coons patches, for the processes of CoarseQuadMesh.densification_xyz_parallel.
+
+	Parameters
+	----------
+	sides : list
+		The polylines ab, bc, dc and ad of each patch, as in discrete_coons_patch.
+
+	Returns
+	-------
+	array
+		The flat array of the coordinates of the points inside the patches, row by row.
+
+	"""
+
+	points = array('d')
+	for ab, bc, dc, ad in sides:
+		n, m = len(ab), len(bc)
+		patch_vertices, patch_faces = discrete_coons_patch(ab, bc, dc, ad)
+		for i in range(1, n - 1):
+			for xyz in patch_vertices[i * m + 1 : (i + 1) * m - 1]:
+				points.extend(xyz)
+	return points
+
+def _patch_corners(mesh, patch):
+	"""Get the corners of a patch of faces by walking along its boundary, for CoarseQuadMesh.from_quad_mesh.
+
+	Parameters
+	----------
+	mesh : Mesh
+		A mesh.
+	patch : list
+		The keys of the faces of the patch.
+
+	Returns
+	-------
+	list
+		The vertices of the boundary of the patch with only one face of the patch, in the order of the face vertices.
+
+	"""
+
+	faces = set(patch)
+
+	start = None
+	for fkey in patch:
+		for u, v in mesh.face_halfedges(fkey):
+			if mesh.halfedge[v][u] not in faces:
+				start = (u, v)
+				break
+		if start is not None:
+			break
+
+	corners = []
+	u, v = start
+	fkey = mesh.halfedge[u][v]
+	while True:
+		# turn around v inside the patch up to the next boundary halfedge
+		count = 1
+		w = mesh.face_vertex_descendant(fkey, v)
+		while mesh.halfedge[w][v] in faces:
+			fkey = mesh.halfedge[w][v]
+			w = mesh.face_vertex_descendant(fkey, v)
+			count += 1
+		if count == 1:
+			corners.append(v)
+		u, v = v, w
+		if (u, v) == start:
+			break
+
+	return corners
+
 # def meshes_join_and_weld(meshes, precision = None, cls = None, data = False):
 # 	"""Join and and weld meshes within some precision distance.
 
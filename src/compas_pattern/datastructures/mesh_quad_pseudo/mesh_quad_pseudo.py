@@ -112,7 +112,7 @@ class PseudoQuadMesh(QuadMesh):
             
         edges = [(u0, v0)]
 
-        count = self.number_of_edges()
+        count = 4 * len(self.face)
         while count > 0:
             count -= 1
 
@@ -132,35 +132,12 @@ class PseudoQuadMesh(QuadMesh):
 
         return edges
 
-    def collect_strips(self):
-        """Collect the strip data.
-
-        Returns
-        -------
-        strip : int
-            The number of strips.
-
-        """
-        self.strip = {}
-
-        edges = list(self.not_none_edges())
-
-        strip = -1
-        while len(edges) > 0:
-            strip += 1
-
-            u0, v0 = edges.pop()
-            strip_edges = self.collect_strip(u0, v0)
-            self.strip.update({strip: strip_edges})
-
-            for u, v in strip_edges:
-                if u != v:
-                    if (u, v) in edges:
-                        edges.remove((u, v))
-                    elif (v, u) in edges:
-                        edges.remove((v, u))
-
-        return strip
+    def _face_halfedge_parity(self, fkey, u):
+        # pseudo quad faces [pole, a, b] are read as quad faces [pole, a, b, pole]
+        if fkey in self.face_pole:
+            face_vertices = self.face_vertices(fkey)
+            return (face_vertices.index(u) - face_vertices.index(self.face_pole[fkey])) % 3 % 2
+        return super(PseudoQuadMesh, self)._face_halfedge_parity(fkey, u)
 
     def has_strip_poles(self, skey):
         return self.strip[skey][0][0] == self.strip[skey][0][1] or self.strip[skey][-1][0] == self.strip[skey][-1][1]
@@ -200,11 +177,10 @@ class PseudoQuadMesh(QuadMesh):
 
         if self.is_vertex_pole(vkey):
             return True
-        elif (self.is_vertex_on_boundary(vkey) and self.vertex_degree(vkey) != 3) or (not self.is_vertex_on_boundary(vkey) and self.vertex_degree(vkey) != 4):
-            return True
 
-        else:
-            return False
+        regular_valency = 3 if self.is_vertex_on_boundary(vkey) else 4
+
+        return len(self.halfedge[vkey]) != regular_valency
 
 
     def vertex_index(self, vkey):
@@ -222,24 +198,27 @@ class PseudoQuadMesh(QuadMesh):
 
         """
 
-        if self.vertex_degree(vkey) == 0:
+        degree = len(self.halfedge[vkey])
+
+        if degree == 0:
             return 0
 
+        on_boundary = self.is_vertex_on_boundary(vkey)
+        regular_valency = 4.0 if not on_boundary else 3.0
+
         if self.is_vertex_pole(vkey):
             if self.is_vertex_full_pole(vkey):
-                if self.is_vertex_on_boundary(vkey):
+                if on_boundary:
                     return 1.0 / 2.0
                 else:
                     return 1.0
             else:
-                adapted_valency = sum([not self.is_face_pseudo_quad(fkey) for fkey in self.vertex_faces(vkey)])
-                if self.is_vertex_on_boundary(vkey):
+                adapted_valency = sum([fkey not in self.face_pole for fkey in self.vertex_faces(vkey)])
+                if on_boundary:
                     adapted_valency += 1
-                regular_valency = 4.0 if not self.is_vertex_on_boundary(vkey) else 3.0
                 return (regular_valency - adapted_valency) / 4.0
         else:
-            regular_valency = 4.0 if not self.is_vertex_on_boundary(vkey) else 3.0
-            return (regular_valency - self.vertex_degree(vkey)) / 4.0
+            return (regular_valency - degree) / 4.0
 
 
     def strip_faces(self, skey):
@@ -273,28 +252,6 @@ class PseudoQuadMesh(QuadMesh):
         return faces
 
 
-    def face_strips(self, fkey):
-        """Return the two strips of a face.
-
-        Parameters
-        ----------
-        fkey : hashable
-
-        Returns
-        -------
-        list
-            The two strips of the face.
-        """
-
-        if self.is_face_pseudo_quad(fkey):
-            pole = self.face_pole[fkey]
-            u = self.face_vertex_descendant(fkey, pole)
-            v = self.face_vertex_descendant(fkey, u)
-            return [self.edge_strip((pole, u)), self.edge_strip((u, v))]
-        else:
-            return [self.edge_strip((u, v)) for u, v in list(self.face_halfedges(fkey))[:2]]
-
-
 #     def add_face(self, vertices, fkey=None, attr_dict=None, **kwattr):
 #         """Add a face to the mesh object. Allow [a, b, c, c] faces.
 
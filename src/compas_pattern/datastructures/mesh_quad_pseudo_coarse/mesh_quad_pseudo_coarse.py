@@ -1,11 +1,8 @@
 from compas_pattern.datastructures.mesh_quad_coarse.mesh_quad_coarse import CoarseQuadMesh
 from compas_pattern.datastructures.mesh_quad_pseudo.mesh_quad_pseudo import PseudoQuadMesh
 
-from compas.geometry import discrete_coons_patch
-from compas.datastructures.mesh import meshes_join_and_weld
 from compas.datastructures.mesh import mesh_weld
 
-from compas.utilities import geometric_key
 from compas.utilities import pairwise
 
 __author__     = ['Robin Oval']
@@ -23,57 +20,51 @@ class CoarsePseudoQuadMesh(PseudoQuadMesh, CoarseQuadMesh):
 		super(CoarsePseudoQuadMesh, self).__init__()
 
 	
-	def densification(self):
-		"""Generate a denser quad mesh from the coarse quad mesh and its strip densities.
+	def densification_face_sides(self, fkey, edge_data):
+		"""Return the data along the sides of a coarse face, such as the vertex keys of the denser quad mesh, with a collapsed side at the pole of a pseudo quad.
+
+		Parameters
+		----------
+		fkey : hashable
+			A face key.
+		edge_data : dict
+			The data of each coarse halfedge, such as the vertex keys along it or its density.
 
 		Returns
 		-------
-		QuadMesh
-			A denser quad mesh.
+		list
+			The data of the four face halfedges, in the order of the face halfedges.
+			A side is None if it is collapsed.
 
 		"""
 
-		pole_map = tuple([geometric_key(self.vertex_coordinates(pole)) for pole in self.poles()])
+		sides = [edge_data[edge] for edge in self.face_halfedges(fkey)]
+		if self.is_face_pseudo_quad(fkey):
+			pole = self.face_pole[fkey]
+			idx = self.face_vertices(fkey).index(pole)
+			sides.insert(idx, None)
+		return sides
 
-		meshes = []
-		for fkey in self.faces():
-			polylines = [[self.edge_point(u, v, float(i) / float(self.get_strip_density(self.edge_strip((u, v))))) for i in range(0, self.get_strip_density(self.edge_strip((u, v))) + 1)] for u, v in self.face_halfedges(fkey)]
-			if self.is_face_pseudo_quad(fkey):
-				pole = self.face_pole[fkey]
-				idx = self.face_vertices(fkey).index(pole)
-				polylines.insert(idx, None)
-			ab, bc, cd, da = polylines
-			if cd is not None:
-				dc = list(reversed(cd))
-			else:
-				dc = None
-			if da is not None:
-				ad = list(reversed(da))
-			else:
-				ad = None
-			vertices, faces = discrete_coons_patch(ab, bc, dc, ad)
-			faces = [[u for u, v in pairwise(face + face[:1]) if u != v] for face in faces]
-			mesh = PseudoQuadMesh.from_vertices_and_faces_with_face_poles(vertices, faces)
-			meshes.append(mesh)
-		
-		face_pole_map = {}
-		for mesh in meshes:
-			for fkey in mesh.faces():
-				for u, v in pairwise(mesh.face_vertices(fkey) + mesh.face_vertices(fkey)[: 1]):
-					if geometric_key(mesh.vertex_coordinates(u)) in pole_map and geometric_key(mesh.vertex_coordinates(u)) == geometric_key(mesh.vertex_coordinates(v)):
-						face_pole_map[geometric_key(mesh.face_center(fkey))] = geometric_key(mesh.vertex_coordinates(u))
-						break
-
-		self.quad_mesh = meshes_join_and_weld(meshes)
+	def _densification(self, densification_xyz):
+
+		edge_keys, face_grids, number_of_vertices = self.densification_grids()
+		vertices = self._densification_vertices(densification_xyz, edge_keys, face_grids, number_of_vertices)
 
+		# the collapsed side of a pseudo quad repeats its pole in the grid, and in the faces along it
+		faces = []
 		face_pole = {}
-		for fkey in self.quad_mesh.faces():
-			if geometric_key(self.quad_mesh.face_center(fkey)) in face_pole_map:
-				for vkey in self.quad_mesh.face_vertices(fkey):
-					if geometric_key(self.quad_mesh.vertex_coordinates(vkey)) == face_pole_map[geometric_key(self.quad_mesh.face_center(fkey))]:
-						face_pole[fkey] = vkey
-						break
-		self.quad_mesh.face_pole = face_pole
+		for fkey in self.faces():
+			grid = face_grids[fkey]
+			n, m = len(grid), len(grid[0])
+			for i in range(n - 1):
+				for j in range(m - 1):
+					face = [grid[i][j], grid[i][j + 1], grid[i + 1][j + 1], grid[i + 1][j]]
+					poles = [u for u, v in pairwise(face + face[:1]) if u == v]
+					if len(poles) > 0:
+						face_pole[len(faces)] = poles[0]
+					faces.append([u for u, v in pairwise(face + face[:1]) if u != v])
+
+		self.quad_mesh = PseudoQuadMesh.from_vertices_and_faces_with_face_poles(vertices, faces, face_pole)
 		return self.quad_mesh
 	
 # ==============================================================================
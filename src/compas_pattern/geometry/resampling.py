@@ -0,0 +1,129 @@
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+from bisect import bisect_right
+
+from compas.geometry import distance_point_point
+
+__author__     = ['Robin Oval']
+__copyright__  = 'Copyright 2018, Block Research Group - ETH Zurich'
+__license__    = 'MIT License'
+__email__      = 'oval@arch.ethz.ch'
+
+__all__ = [
+	'resample_polylines',
+	'resample_polylines_numpy'
+]
+
+
+def resample_polylines(polylines, parameters):
+	"""Evaluate polylines at normalised arc-length parameters.
+
+	The cumulative lengths of the segments are computed once per polyline and the segment of each parameter is found by bisection.
+
+	Parameters
+	----------
+	polylines : list
+		The polylines, as lists of point coordinates.
+	parameters : list
+		The parameters between 0 and 1 to evaluate on each polyline, as lists of floats.
+
+	Returns
+	-------
+	list
+		The points of each polyline at its parameters, as lists of point coordinates.
+
+	Notes
+	-----
+	The points are the ones of compas.geometry.Polyline.point.
+
+	"""
+
+	resampled = []
+
+	for points, params in zip(polylines, parameters):
+
+		lengths = [0.0]
+		for i in range(len(points) - 1):
+			lengths.append(lengths[-1] + distance_point_point(points[i], points[i + 1]))
+		total = lengths[-1]
+
+		polyline = []
+		for t in params:
+			if t <= 0.0 or total == 0.0:
+				polyline.append(list(points[0]))
+				continue
+			if t >= 1.0:
+				polyline.append(list(points[-1]))
+				continue
+			s = t * total
+			i = min(bisect_right(lengths, s) - 1, len(points) - 2)
+			w = (s - lengths[i]) / (lengths[i + 1] - lengths[i])
+			a, b = points[i], points[i + 1]
+			polyline.append([a[0] + w * (b[0] - a[0]), a[1] + w * (b[1] - a[1]), a[2] + w * (b[2] - a[2])])
+		resampled.append(polyline)
+
+	return resampled
+
+
+def resample_polylines_numpy(polylines, parameters):
+	"""Evaluate polylines at normalised arc-length parameters, with all the polylines packed in one array.
+
+	Parameters
+	----------
+	polylines : list
+		The polylines, as lists of point coordinates.
+	parameters : list
+		The parameters between 0 and 1 to evaluate on each polyline, as lists of floats.
+
+	Returns
+	-------
+	array
+		The (n, 3) array of the points of all the polylines at their parameters, in the order of the parameters.
+
+	Notes
+	-----
+	Requires numpy.
+
+	"""
+
+	import numpy as np
+
+	sizes = np.array([len(points) for points in polylines], dtype=int)
+	starts = np.cumsum(sizes) - sizes
+	ends = starts + sizes - 1
+	points = np.array([xyz for polyline in polylines for xyz in polyline], dtype=float).reshape((-1, 3))
+
+	# cumulative lengths along the packed points, without the segments between consecutive polylines
+	segments = np.sqrt(np.sum((points[1:] - points[:-1]) ** 2, axis=1))
+	segments[ends[:-1]] = 0.0
+	lengths = np.concatenate(([0.0], np.cumsum(segments)))
+
+	counts = np.array([len(params) for params in parameters], dtype=int)
+	t = np.clip(np.array([t for params in parameters for t in params], dtype=float), 0.0, 1.0)
+	start, end = np.repeat(starts, counts), np.repeat(ends, counts)
+	s = lengths[start] + t * (lengths[end] - lengths[start])
+
+	i = np.clip(np.searchsorted(lengths, s, side='right') - 1, start, np.maximum(end - 1, start))
+	j = np.minimum(i + 1, end)
+	dl = lengths[j] - lengths[i]
+	w = np.where(dl > 0.0, (s - lengths[i]) / np.where(dl > 0.0, dl, 1.0), 0.0)
+
+	resampled = points[i] + w[:, np.newaxis] * (points[j] - points[i])
+	resampled[t >= 1.0] = points[end[t >= 1.0]]
+
+	return resampled
+
+
+# ==============================================================================
+# Main
+# ==============================================================================
+
+if __name__ == '__main__':
+
+	polylines = [[[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [1.0, 2.0, 0.0]], [[0.0, 0.0, 0.0], [0.0, 0.0, 4.0]]]
+	parameters = [[0.0, 0.25, 0.5, 1.0], [0.0, 0.5, 1.0]]
+
+	print(resample_polylines(polylines, parameters))
+	print(resample_polylines_numpy(polylines, parameters))
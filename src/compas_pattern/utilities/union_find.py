@@ -0,0 +1,69 @@
+__all__ = [
+    'union_find_groups'
+]
+
+
+def union_find_groups(items, pairs):
+    """Partition items into the groups of items connected by pairs, using a union-find structure.
+
+    Parameters
+    ----------
+    items : list
+        A list of hashable items.
+    pairs : list
+        A list of pairs of connected items.
+        Items in pairs that are not in the list of items are added after them.
+
+    Returns
+    -------
+    groups : list
+        The groups of connected items, as lists sorted by first occurence in the items.
+        The groups are sorted by the first occurence of their first item.
+
+    """
+
+    parent = {}
+
+    def find(item):
+        root = item
+        while parent[root] != root:
+            root = parent[root]
+        # compress path
+        while parent[item] != root:
+            parent[item], item = root, parent[item]
+        return root
+
+    order = []
+    for item in items:
+        if item not in parent:
+            parent[item] = item
+            order.append(item)
+
+    for u, v in pairs:
+        for item in (u, v):
+            if item not in parent:
+                parent[item] = item
+                order.append(item)
+        root_u, root_v = find(u), find(v)
+        if root_u != root_v:
+            parent[root_v] = root_u
+
+    groups = {}
+    roots = []
+    for item in order:
+        root = find(item)
+        if root not in groups:
+            groups[root] = []
+            roots.append(root)
+        groups[root].append(item)
+
+    return [groups[root] for root in roots]
+
+
+# ==============================================================================
+# Main
+# ==============================================================================
+
+if __name__ == '__main__':
+
+    print union_find_groups(range(8), [(0, 3), (3, 5), (6, 7)])
@@ -0,0 +1,250 @@
+from math import cos
+from math import sin
+from math import pi
+
+from compas.topology import breadth_first_paths
+
+from compas_pattern.datastructures.mesh_quad.mesh_quad import QuadMesh
+
+from compas_pattern.datastructures.mesh_quad.grammar_pattern import add_strip
+from compas_pattern.datastructures.mesh_quad.grammar_pattern import add_strips
+from compas_pattern.datastructures.mesh_quad.grammar_pattern import delete_strip
+from compas_pattern.datastructures.mesh_quad.grammar_pattern import delete_strips
+from compas_pattern.datastructures.mesh_quad.grammar_pattern import split_strip
+from compas_pattern.datastructures.mesh_quad.grammar_pattern import mesh_kinks_xyz
+from compas_pattern.datastructures.mesh_quad.grammar_pattern import rebuild_geometry
+from compas_pattern.datastructures.mesh_quad.grammar_pattern import layered_shortest_path
+from compas_pattern.datastructures.mesh_quad.grammar_pattern import is_layered_path
+
+
+def grid_quad_mesh(n):
+	vertices = [[float(i), float(j), 0.0] for j in range(n + 1) for i in range(n + 1)]
+	faces = [[j * (n + 1) + i, j * (n + 1) + i + 1, (j + 1) * (n + 1) + i + 1, (j + 1) * (n + 1) + i] for j in range(n) for i in range(n)]
+	mesh = QuadMesh.from_vertices_and_faces(vertices, faces)
+	mesh.collect_strips()
+	return mesh
+
+
+def annulus_quad_mesh(n, m):
+	vertices = [[(1 + j) * cos(2 * pi * i / n), (1 + j) * sin(2 * pi * i / n), 0.0] for j in range(m + 1) for i in range(n)]
+	faces = [[j * n + i, j * n + (i + 1) % n, (j + 1) * n + (i + 1) % n, (j + 1) * n + i] for j in range(m) for i in range(n)]
+	mesh = QuadMesh.from_vertices_and_faces(vertices, faces)
+	mesh.collect_strips()
+	return mesh
+
+
+def strip_edge_sets(mesh):
+	return sorted(sorted(tuple(sorted(edge)) for edge in edges) for edges in mesh.strip.values())
+
+
+def face_topology(mesh):
+	# the faces with their vertices labelled by their faces, as the vertex keys may differ
+	labels = {vkey: tuple(sorted(mesh.vertex_faces(vkey))) for vkey in mesh.vertices()}
+	return {fkey: sorted(labels[vkey] for vkey in mesh.face_vertices(fkey)) for fkey in mesh.faces()}
+
+
+def coordinates(mesh):
+	return sorted([tuple(round(a, 6) for a in mesh.vertex_coordinates(vkey)) for vkey in mesh.vertices()])
+
+
+# ==============================================================================
+# Strip addition
+# ==============================================================================
+
+def test_add_strip_local_smoothing_by_default():
+	mesh_1 = grid_quad_mesh(4)
+	mesh_2 = grid_quad_mesh(4)
+	add_strip(mesh_1, [10, 11, 12, 13, 14])
+	add_strip(mesh_2, [10, 11, 12, 13, 14], k_ring=3)
+	assert coordinates(mesh_1) == coordinates(mesh_2)
+
+
+def test_add_strip_global_smoothing():
+	mesh_1 = grid_quad_mesh(8)
+	mesh_2 = grid_quad_mesh(8)
+	add_strip(mesh_1, list(range(9, 18)))
+	add_strip(mesh_2, list(range(9, 18)), k_ring=None)
+	# the vertices more than three rings away from the new strip only move with the global smoothing
+	assert mesh_1.vertex_coordinates(67) == [4.0, 7.0, 0.0]
+	assert mesh_2.vertex_coordinates(67) != [4.0, 7.0, 0.0]
+
+
+def test_add_strip_local_smoothing():
+	mesh = grid_quad_mesh(6)
+	new_skey, left_polyedge, right_polyedge = add_strip(mesh, [21, 22, 23, 24, 25, 26, 27], k_ring=1)
+	assert mesh.number_of_faces() == 42
+	# the vertices more than one ring away from the new strip do not move
+	for vkey in [0, 1, 2, 3, 4, 5, 6, 42, 43, 44, 45, 46, 47, 48]:
+		assert mesh.vertex_coordinates(vkey) == [float(vkey % 7), float(vkey // 7), 0.0]
+
+
+def test_kinks_cached_per_version():
+	mesh = grid_quad_mesh(4)
+	kinks_xyz = mesh_kinks_xyz(mesh)
+	assert mesh_kinks_xyz(mesh) is kinks_xyz
+	mesh.vertex[2]['y'] -= 2.0
+	mesh.update_version(topology=False)
+	assert mesh.vertex_coordinates(2) in mesh_kinks_xyz(mesh)
+
+
+def test_add_strip_kinks_after_direct_vertex_move():
+	mesh = grid_quad_mesh(4)
+	add_strip(mesh, [3, 8, 13, 18, 23], k_ring=3)
+	mesh.vertex[2]['y'] -= 2.0
+	mesh.update_version(topology=False)
+	xyz = mesh.vertex_coordinates(2)
+	add_strip(mesh, [1, 6, 11, 16, 21], k_ring=3)
+	# the new kink is fixed
+	assert mesh.vertex_coordinates(2) == xyz
+
+
+# ==============================================================================
+# Topology-only edits
+# ==============================================================================
+
+def test_topology_only_edits():
+	mesh_1 = grid_quad_mesh(4)
+	mesh_2 = grid_quad_mesh(4)
+	add_strips(mesh_1, [[10, 11, 12, 13, 14], [2, 7, 12, 17, 22]])
+	add_strips(mesh_2, [[10, 11, 12, 13, 14], [2, 7, 12, 17, 22]], geometry=False)
+	assert sorted(mesh_1.face_vertices(fkey) for fkey in mesh_1.faces()) == sorted(mesh_2.face_vertices(fkey) for fkey in mesh_2.faces())
+	# the kinks of the initial geometry are kept until the geometry is rebuilt, outside of the mesh data
+	assert sorted(mesh_kinks_xyz(mesh_2)) == [[0.0, 0.0, 0.0], [0.0, 4.0, 0.0], [4.0, 0.0, 0.0], [4.0, 4.0, 0.0]]
+	assert 'kinks_xyz' not in mesh_2.attributes
+	rebuild_geometry(mesh_2)
+	assert sorted(mesh_kinks_xyz(mesh_2)) == [[0.0, 0.0, 0.0], [0.0, 4.0, 0.0], [4.0, 0.0, 0.0], [4.0, 4.0, 0.0]]
+
+
+def test_topology_only_kinks_after_direct_vertex_move():
+	mesh = grid_quad_mesh(4)
+	delete_strips(mesh, [0], geometry=False)
+	rebuild_geometry(mesh)
+	mesh.vertex[22]['y'] += 2.0
+	mesh.update_version(topology=False)
+	kinks_xyz = mesh_kinks_xyz(mesh)
+	assert mesh.vertex_coordinates(22) in kinks_xyz
+	delete_strips(mesh, [mesh.edge_strip((15, 20))], geometry=False)
+	assert mesh_kinks_xyz(mesh) == kinks_xyz
+
+
+def test_topology_only_kinks_after_geometry_edit():
+	mesh = grid_quad_mesh(4)
+	delete_strips(mesh, [0], geometry=False)
+	mesh.set_vertex_attribute(1, 'y', -2.0)
+	# the kept kinks are dropped by the edit of the geometry
+	assert [1.0, -2.0, 0.0] in mesh_kinks_xyz(mesh)
+
+
+def test_topology_only_undo():
+	mesh = grid_quad_mesh(4)
+	mesh.begin()
+	delete_strips(mesh, [0], geometry=False)
+	mesh.commit()
+	kinks_xyz = mesh_kinks_xyz(mesh)
+	mesh.begin()
+	delete_strips(mesh, [mesh.edge_strip((15, 20))], geometry=False)
+	mesh.commit()
+	mesh.undo()
+	# the kinks kept before the undone edit are restored
+	assert mesh_kinks_xyz(mesh) is kinks_xyz
+
+
+# ==============================================================================
+# Strip deletion
+# ==============================================================================
+
+def test_delete_strips_matches_delete_strip():
+	for skeys in [[0], [0, 1], [0, 4, 5]]:
+		mesh_1 = grid_quad_mesh(4)
+		mesh_2 = mesh_1.copy()
+		mesh_2.collect_strips()
+		deleted = set([fkey for skey in skeys for fkey in mesh_1.strip_faces(skey)])
+		strip_faces = [sorted(set(mesh_1.strip_faces(skey)) - deleted) for skey in mesh_1.strips() if skey not in skeys]
+		delete_strips(mesh_1, skeys)
+		for skey in skeys:
+			delete_strip(mesh_2, skey)
+		assert face_topology(mesh_1) == face_topology(mesh_2)
+		assert sorted(sorted(mesh_1.strip_faces(skey)) for skey in mesh_1.strips()) == sorted(strip_faces)
+		assert sorted(sorted(mesh_2.strip_faces(skey)) for skey in mesh_2.strips()) == sorted(strip_faces)
+
+
+def test_delete_strips_geometry():
+	mesh = grid_quad_mesh(4)
+	# the three rows of vertices of the two first rows of faces are merged at once,
+	# on the centroid of the two rows of vertices disconnected from the remaining faces
+	delete_strips(mesh, [mesh.edge_strip((1, 6)), mesh.edge_strip((6, 11))])
+	assert mesh.number_of_faces() == 8
+	assert sorted(set(round(mesh.vertex_coordinates(vkey)[1], 6) for vkey in mesh.vertices())) == [0.5, 3.0, 4.0]
+
+
+# ==============================================================================
+# Strip split
+# ==============================================================================
+
+def test_split_strip_matches_add_strip():
+	for build in [lambda: grid_quad_mesh(4), lambda: annulus_quad_mesh(8, 3)]:
+		for skey in list(build().strips()):
+			for n in [2, 3]:
+				mesh_1 = build()
+				skeys = split_strip(mesh_1, skey, n)
+				# the strips refining the strip by adding strips along its contour
+				mesh_2 = build()
+				for i in range(n - 1):
+					add_strip(mesh_2, mesh_2.strip_contour_polyedges(skey)[0], geometry=False)
+				assert len(set(skeys)) == n and all(skey in mesh_1.strip for skey in skeys)
+				assert mesh_1.number_of_faces() == mesh_2.number_of_faces()
+				assert mesh_1.number_of_vertices() == mesh_2.number_of_vertices()
+				assert sorted(len(edges) for edges in mesh_1.strip.values()) == sorted(len(edges) for edges in mesh_2.strip.values())
+				assert sorted(mesh_1.vertex_degree(vkey) for vkey in mesh_1.vertices()) == sorted(mesh_2.vertex_degree(vkey) for vkey in mesh_2.vertices())
+				# the strip data is the one collected from the new topology
+				mesh_3 = mesh_1.copy()
+				mesh_3.collect_strips()
+				assert strip_edge_sets(mesh_1) == strip_edge_sets(mesh_3)
+
+
+def test_split_strip_geometry():
+	mesh = grid_quad_mesh(4)
+	split_strip(mesh, mesh.edge_strip((0, 5)), 4)
+	# the new vertices are interpolated along the strip edges
+	assert coordinates(mesh) == sorted(set([(float(i), j / 4.0, 0.0) for i in range(5) for j in range(5)] + [(float(i), float(j), 0.0) for i in range(5) for j in range(1, 5)]))
+
+
+# ==============================================================================
+# Polyedge remapping
+# ==============================================================================
+
+def test_layered_shortest_path():
+	mesh = grid_quad_mesh(4)
+	adjacency = {vkey: mesh.vertex_neighbors(vkey) for vkey in mesh.vertices()}
+	layers = [set([0, 5]), set([6, 1, 10, 11]), set([2, 7, 12]), set([3, 8, 13]), set([4, 9, 14])]
+	expected = None
+	for path in breadth_first_paths(adjacency, 0, 14):
+		if is_layered_path(path, layers):
+			expected = path
+			break
+	assert layered_shortest_path(adjacency, layers, 0, 14) == expected
+	assert layered_shortest_path(adjacency, layers, 0, 24) is None
+
+
+def test_layered_shortest_path_overlapping_layers():
+	mesh = grid_quad_mesh(4)
+	adjacency = {vkey: mesh.vertex_neighbors(vkey) for vkey in mesh.vertices()}
+	# the path goes back through the first vertices, but not through the same ones
+	layers = [set([4]), set([3, 8]), set([2, 7]), set([3, 8]), set([9])]
+	assert layered_shortest_path(adjacency, layers, 4, 9) == [4, 3, 2, 7, 8, 9]
+	assert layered_shortest_path(adjacency, [set([4]), set([3]), set([2]), set([3]), set([8])], 4, 8) is None
+
+
+def test_layered_shortest_path_long():
+	# a ladder with a layer per rung, long enough for a quadratic search to stall
+	n = 20000
+	adjacency = {}
+	for k in range(n):
+		for a, b in [((k, 0), (k, 1)), ((k, 0), (k + 1, 0)), ((k, 1), (k + 1, 1))]:
+			if b[0] < n:
+				adjacency.setdefault(a, []).append(b)
+				adjacency.setdefault(b, []).append(a)
+	layers = [set([(k, 0), (k, 1)]) for k in range(n)]
+	path = layered_shortest_path(adjacency, layers, (0, 0), (n - 1, 1))
+	assert len(path) == n + 1
+	assert is_layered_path(path, layers)
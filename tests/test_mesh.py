@@ -0,0 +1,161 @@
+from math import pi
+
+from compas_pattern.datastructures.mesh.mesh import Mesh
+
+
+def grid_mesh(n):
+	vertices = [[float(i), float(j), 0.0] for j in range(n + 1) for i in range(n + 1)]
+	faces = [[j * (n + 1) + i, j * (n + 1) + i + 1, (j + 1) * (n + 1) + i + 1, (j + 1) * (n + 1) + i] for j in range(n) for i in range(n)]
+	return Mesh.from_vertices_and_faces(vertices, faces)
+
+
+# ==============================================================================
+# Versions and cache
+# ==============================================================================
+
+def test_versions():
+	mesh = grid_mesh(2)
+	topology, geometry = mesh.topology_version, mesh.geometry_version
+	mesh.set_vertex_attribute(0, 'x', -1.0)
+	assert mesh.topology_version == topology
+	assert mesh.geometry_version > geometry
+	mesh.delete_face(0)
+	assert mesh.topology_version > topology
+
+
+def test_cached():
+	mesh = grid_mesh(2)
+	calls = []
+
+	def func():
+		calls.append(None)
+		return mesh.number_of_faces()
+
+	assert mesh.cached('number_of_faces', func) == 4
+	assert mesh.cached('number_of_faces', func) == 4
+	assert len(calls) == 1
+	mesh.set_vertex_attribute(0, 'x', -1.0)
+	assert mesh.is_cached('number_of_faces')
+	assert not mesh.is_cached('number_of_faces', geometry=True)
+	mesh.delete_face(0)
+	assert not mesh.is_cached('number_of_faces')
+	assert mesh.cached('number_of_faces', func) == 3
+	assert len(calls) == 2
+
+
+def test_kinks_after_direct_vertex_move():
+	mesh = grid_mesh(4)
+	assert sorted(mesh.kinks(pi / 12)) == [0, 4, 20, 24]
+	mesh.vertex[2]['y'] -= 2.0
+	assert sorted(mesh.kinks(pi / 12)) == [0, 1, 2, 3, 4, 20, 24]
+
+
+# ==============================================================================
+# Boundary masks
+# ==============================================================================
+
+def test_vertex_boundary_mask():
+	mesh = grid_mesh(3)
+	mesh.delete_face(4)
+	assert mesh.vertex_boundary_mask() == {vkey: super(Mesh, mesh).is_vertex_on_boundary(vkey) for vkey in mesh.vertices()}
+
+
+def test_edge_boundary_mask():
+	mesh = grid_mesh(3)
+	mesh.delete_face(4)
+	mask = mesh.edge_boundary_mask()
+	for u, v in mesh.edges():
+		assert mask[(u, v)] == mask[(v, u)] == super(Mesh, mesh).is_edge_on_boundary(u, v)
+
+
+def test_boundary_mask_after_topology_change():
+	mesh = grid_mesh(3)
+	mesh.vertex_boundary_mask()
+	mesh.edge_boundary_mask()
+	assert not mesh.is_vertex_on_boundary(5)
+	assert not mesh.is_edge_on_boundary(5, 6)
+	mesh.delete_face(4)
+	assert mesh.is_vertex_on_boundary(5)
+	assert mesh.is_edge_on_boundary(5, 6)
+	assert mesh.vertices_on_boundary() == super(Mesh, mesh).vertices_on_boundary()
+
+
+# ==============================================================================
+# Transactions
+# ==============================================================================
+
+def mesh_data(mesh):
+	return mesh.vertex, mesh.face, mesh.halfedge
+
+
+def copy_data(mesh):
+	return {vkey: dict(attr) for vkey, attr in mesh.vertex.items()}, {fkey: list(vertices) for fkey, vertices in mesh.face.items()}, {u: dict(nbrs) for u, nbrs in mesh.halfedge.items()}
+
+
+def test_rollback():
+	mesh = grid_mesh(3)
+	data = copy_data(mesh)
+	mesh.begin()
+	mesh.delete_face(4)
+	mesh.delete_vertex(0)
+	mesh.set_vertex_attribute(5, 'z', 1.0)
+	mesh.add_face([mesh.add_vertex(x=4.0, y=4.0, z=0.0), 15, 11])
+	mesh.rollback()
+	assert not mesh.is_recording()
+	assert mesh_data(mesh) == data
+
+
+def test_rollback_flip_cycles():
+	mesh = grid_mesh(3)
+	data = copy_data(mesh)
+	topology = mesh.topology_version
+	mesh.begin()
+	mesh.flip_cycles()
+	assert mesh.topology_version > topology
+	mesh.rollback()
+	assert mesh_data(mesh) == data
+
+
+def test_undo_redo():
+	mesh = grid_mesh(3)
+	data_0 = copy_data(mesh)
+	mesh.begin()
+	mesh.delete_face(4)
+	mesh.commit()
+	data_1 = copy_data(mesh)
+	assert mesh.undo()
+	assert mesh_data(mesh) == data_0
+	assert mesh.redo()
+	assert mesh_data(mesh) == data_1
+	assert not mesh.redo()
+
+
+def test_nested_rollback():
+	mesh = grid_mesh(3)
+	data_0 = copy_data(mesh)
+	mesh.begin()
+	mesh.delete_face(0)
+	data_1 = copy_data(mesh)
+	mesh.begin()
+	mesh.delete_face(4)
+	mesh.rollback()
+	# the outer transaction goes on
+	assert mesh.is_recording()
+	assert mesh_data(mesh) == data_1
+	mesh.rollback()
+	assert not mesh.is_recording()
+	assert mesh_data(mesh) == data_0
+
+
+def test_nested_commit():
+	mesh = grid_mesh(3)
+	data_0 = copy_data(mesh)
+	mesh.begin()
+	mesh.delete_face(0)
+	mesh.begin()
+	mesh.delete_face(4)
+	mesh.delete_face(1)
+	mesh.commit()
+	assert mesh.is_recording()
+	mesh.rollback()
+	assert mesh_data(mesh) == data_0
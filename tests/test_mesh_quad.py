@@ -0,0 +1,222 @@
+import pytest
+
+from compas_pattern.datastructures.mesh_quad.mesh_quad import QuadMesh
+
+from compas_pattern.datastructures.mesh_quad.grammar_pattern import add_strip
+from compas_pattern.datastructures.mesh_quad.grammar_pattern import delete_strip
+
+
+def grid_quad_mesh(n):
+	vertices = [[float(i), float(j), 0.0] for j in range(n + 1) for i in range(n + 1)]
+	faces = [[j * (n + 1) + i, j * (n + 1) + i + 1, (j + 1) * (n + 1) + i + 1, (j + 1) * (n + 1) + i] for j in range(n) for i in range(n)]
+	mesh = QuadMesh.from_vertices_and_faces(vertices, faces)
+	mesh.collect_strips()
+	return mesh
+
+
+def coarse_quad_mesh():
+	vertices = [[1.909, 11.216, 0.0], [9.717, 9.025, 0.0], [4.361, 4.712, 0.0], [3.813, 13.209, 0.0], [1.909, 13.209, 0.0], [4.765, 2.248, 0.0], [5.793, 9.437, 0.0], [9.161, 6.405, 0.0], [14.287, 5.237, 0.0], [14.287, 2.248, 0.0], [14.287, 13.209, 0.0], [1.909, 2.248, 0.0], [4.15, 10.981, 0.0], [11.538, 5.004, 0.0], [11.43, 2.248, 0.0], [5.793, 6.759, 0.0], [14.287, 10.22, 0.0], [1.909, 4.241, 0.0], [11.43, 13.209, 0.0], [11.736, 10.641, 0.0]]
+	faces = [[7, 15, 2, 13], [15, 6, 12, 2], [6, 1, 19, 12], [1, 7, 13, 19], [8, 16, 19, 13], [16, 10, 18, 19], [18, 3, 12, 19], [3, 4, 0, 12], [0, 17, 2, 12], [17, 11, 5, 2], [5, 14, 13, 2], [14, 9, 8, 13]]
+	mesh = QuadMesh.from_vertices_and_faces(vertices, faces)
+	mesh.collect_strips()
+	return mesh
+
+
+def scanned_strips(mesh):
+	# collect the strips by removing the edges of each strip from the list of the edges left
+	strips = {}
+	edges = list(mesh.not_none_edges())
+	while len(edges) > 0:
+		u0, v0 = edges.pop()
+		strips[len(strips)] = mesh.collect_strip(u0, v0)
+		for u, v in strips[len(strips) - 1]:
+			if (u, v) in edges:
+				edges.remove((u, v))
+			elif (v, u) in edges:
+				edges.remove((v, u))
+	return strips
+
+
+def scanned_polyedges(mesh):
+	# collect the polyedges by removing the edges of each polyedge from the list of the edges left
+	polyedges = []
+	edges = list(mesh.edges())
+	while len(edges) > 0:
+		u0, v0 = edges.pop()
+		polyedges.append(mesh.polyedge(u0, v0))
+		for u, v in zip(polyedges[-1][: -1], polyedges[-1][1 :]):
+			if (u, v) in edges:
+				edges.remove((u, v))
+			elif (v, u) in edges:
+				edges.remove((v, u))
+	return polyedges
+
+
+def scanned_vertex_strip_edges(mesh, vkey):
+	return sorted((skey, i) for skey in mesh.strips() for i, edge in enumerate(mesh.strip_edges(skey)) if vkey in edge)
+
+
+def strip_index(mesh):
+	return dict(mesh.edge_to_strip), {fkey: sorted(strips) for fkey, strips in mesh.face_to_strips.items()}
+
+
+# ==============================================================================
+# Strip index
+# ==============================================================================
+
+def test_edge_strip():
+	for mesh in [grid_quad_mesh(3), coarse_quad_mesh()]:
+		for skey in mesh.strips():
+			for u, v in mesh.strip_edges(skey):
+				assert mesh.edge_strip((u, v)) == skey
+				assert mesh.edge_strip((v, u)) == skey
+
+
+def test_face_strips():
+	for mesh in [grid_quad_mesh(3), coarse_quad_mesh()]:
+		for fkey in mesh.faces():
+			# the two strips crossing the first two halfedges of the face
+			strips = [skey for u, v in list(mesh.face_halfedges(fkey))[: 2] for skey in mesh.strips() if (u, v) in mesh.strip_edges(skey) or (v, u) in mesh.strip_edges(skey)]
+			assert mesh.face_strips(fkey) == strips
+
+
+def test_strip_index_after_edits():
+	mesh = grid_quad_mesh(4)
+	add_strip(mesh, [10, 11, 12, 13, 14])
+	delete_strip(mesh, mesh.edge_strip((0, 1)))
+	index = strip_index(mesh)
+	mesh.index_strips()
+	assert strip_index(mesh) == index
+
+
+# ==============================================================================
+# Strip collection
+# ==============================================================================
+
+def test_collect_strips():
+	for mesh in [grid_quad_mesh(3), coarse_quad_mesh()]:
+		assert mesh.strip == scanned_strips(mesh)
+		assert mesh.collect_strips() == mesh.number_of_strips() - 1
+
+
+def test_collect_strips_after_topology_change():
+	mesh = grid_quad_mesh(3)
+	strip = mesh.strip
+	# the strips are not collected again as long as the topology is unchanged
+	mesh.collect_strips()
+	assert mesh.strip is strip
+	mesh.delete_face(4)
+	mesh.collect_strips()
+	assert mesh.strip is not strip
+	assert mesh.strip == scanned_strips(mesh)
+
+
+def test_collect_strips_after_flip_cycles():
+	mesh = coarse_quad_mesh()
+	# the halfedges are rebuilt, which changes the direction of the strips
+	mesh.flip_cycles()
+	mesh.collect_strips()
+	assert mesh.strip == scanned_strips(mesh)
+
+
+# ==============================================================================
+# Polyedges
+# ==============================================================================
+
+def test_polyedges():
+	for mesh in [grid_quad_mesh(3), coarse_quad_mesh()]:
+		assert mesh.polyedges() == scanned_polyedges(mesh)
+
+
+def test_collect_polyedges():
+	mesh = coarse_quad_mesh()
+	polyedges, vertex_polyedges = mesh.collect_polyedges()
+	assert vertex_polyedges == {vkey: [i for i, polyedge in enumerate(polyedges) if vkey in polyedge] for vkey in mesh.vertices()}
+
+
+def test_collect_polyedges_returns_copies():
+	mesh = coarse_quad_mesh()
+	collected = mesh.collect_polyedges()
+	polyedges, vertex_polyedges = mesh.collect_polyedges()
+	polyedges[0].append(None)
+	vertex_polyedges[0].append(None)
+	assert mesh.collect_polyedges() == collected
+
+
+# ==============================================================================
+# Singularities
+# ==============================================================================
+
+def test_singularities():
+	mesh = coarse_quad_mesh()
+	for i in range(2):
+		singularities = [vkey for vkey in mesh.vertices() if len(mesh.vertex_neighbors(vkey)) != (3 if None in mesh.halfedge[vkey].values() else 4)]
+		assert mesh.singularities() == singularities
+		# the cached boundary mask is updated with the topology
+		mesh.delete_face(i)
+
+
+# ==============================================================================
+# Strip geometry
+# ==============================================================================
+
+def test_strip_polylines_numpy():
+	np = pytest.importorskip('numpy')
+	# a closed strip around a square hole, accross the strips of the sides
+	vertices = [[-1.0, -1.0, 0.0], [1.0, -1.0, 0.0], [1.0, 1.0, 0.0], [-1.0, 1.0, 0.0], [-2.0, -2.0, 0.0], [2.0, -2.0, 0.0], [2.0, 2.0, 0.0], [-2.0, 2.0, 0.0]]
+	faces = [[i, 4 + i, 4 + (i + 1) % 4, (i + 1) % 4] for i in range(4)]
+	mesh = QuadMesh.from_vertices_and_faces(vertices, faces)
+	mesh.collect_strips()
+	polylines = mesh.strip_polylines_numpy()
+	assert polylines['strips'] == list(mesh.strips())
+	assert any(mesh.is_strip_closed(skey) for skey in mesh.strips())
+	for i, skey in enumerate(polylines['strips']):
+		a, b = polylines['edge_offsets'][i : i + 2]
+		assert np.allclose(polylines['edge_polylines'][a : b], mesh.strip_edge_polyline(skey))
+		starts, ends = mesh.strip_contour_polylines(skey)
+		assert np.allclose(polylines['contour_polylines'][0][a : b], starts)
+		assert np.allclose(polylines['contour_polylines'][1][a : b], ends)
+		a, b = polylines['face_offsets'][i : i + 2]
+		assert np.allclose(polylines['face_polylines'][a : b], mesh.strip_face_polyline(skey))
+
+
+# ==============================================================================
+# Strip updates
+# ==============================================================================
+
+def test_vertex_strip_edges():
+	mesh = grid_quad_mesh(4)
+	add_strip(mesh, [10, 11, 12, 13, 14])
+	delete_strip(mesh, mesh.edge_strip((0, 1)))
+	for vkey in mesh.vertices():
+		assert mesh.vertex_strip_edges(vkey) == scanned_vertex_strip_edges(mesh, vkey)
+
+
+def test_substitute_vertex_in_strips():
+	mesh = grid_quad_mesh(3)
+	strips = {skey: [tuple([16 if vkey == 5 else vkey for vkey in edge]) for edge in edges] for skey, edges in mesh.strip.items()}
+	mesh.substitute_vertex_in_strips(5, 16)
+	assert mesh.strip == strips
+	assert mesh.vertex_strip_edges(5) == []
+	assert mesh.vertex_strip_edges(16) == scanned_vertex_strip_edges(mesh, 16)
+
+
+def test_substitute_vertex_in_some_strips():
+	mesh = grid_quad_mesh(3)
+	skey = mesh.edge_strip((5, 6))
+	strips = {skey: list(edges) for skey, edges in mesh.strip.items()}
+	strips[skey] = [tuple([16 if vkey == 5 else vkey for vkey in edge]) for edge in strips[skey]]
+	mesh.substitute_vertex_in_strips(5, 16, [skey])
+	assert mesh.strip == strips
+	assert mesh.vertex_strip_edges(5) == scanned_vertex_strip_edges(mesh, 5)
+	assert mesh.vertex_strip_edges(16) == scanned_vertex_strip_edges(mesh, 16)
+	assert mesh.edge_strip((16, 6)) == skey
+
+
+def test_delete_faces_in_strips():
+	mesh = grid_quad_mesh(3)
+	strips = {skey: [(u, v) for u, v in edges if mesh.halfedge[u][v] not in [4, 5]] for skey, edges in mesh.strip.items()}
+	mesh.delete_faces_in_strips([4, 5])
+	assert mesh.strip == strips
+	for vkey in mesh.vertices():
+		assert mesh.vertex_strip_edges(vkey) == scanned_vertex_strip_edges(mesh, vkey)
@@ -0,0 +1,54 @@
+import pytest
+
+from compas_pattern.datastructures.mesh_quad.mesh_quad import QuadMesh
+
+np = pytest.importorskip('numpy')
+
+from compas_pattern.datastructures.mesh_quad.mesh_quad_array import QuadMeshArray
+
+
+def coarse_quad_mesh():
+	vertices = [[1.909, 11.216, 0.0], [9.717, 9.025, 0.0], [4.361, 4.712, 0.0], [3.813, 13.209, 0.0], [1.909, 13.209, 0.0], [4.765, 2.248, 0.0], [5.793, 9.437, 0.0], [9.161, 6.405, 0.0], [14.287, 5.237, 0.0], [14.287, 2.248, 0.0], [14.287, 13.209, 0.0], [1.909, 2.248, 0.0], [4.15, 10.981, 0.0], [11.538, 5.004, 0.0], [11.43, 2.248, 0.0], [5.793, 6.759, 0.0], [14.287, 10.22, 0.0], [1.909, 4.241, 0.0], [11.43, 13.209, 0.0], [11.736, 10.641, 0.0]]
+	faces = [[7, 15, 2, 13], [15, 6, 12, 2], [6, 1, 19, 12], [1, 7, 13, 19], [8, 16, 19, 13], [16, 10, 18, 19], [18, 3, 12, 19], [3, 4, 0, 12], [0, 17, 2, 12], [17, 11, 5, 2], [5, 14, 13, 2], [14, 9, 8, 13]]
+	mesh = QuadMesh.from_vertices_and_faces(vertices, faces)
+	mesh.collect_strips()
+	return mesh
+
+
+def edge_sets(polyedges):
+	# the polyedges and strips may differ by their order and their starting items
+	return sorted(sorted(tuple(sorted(edge)) for edge in edges) for edges in polyedges)
+
+
+def test_snapshot_round_trip():
+	mesh = coarse_quad_mesh()
+	snapshot = QuadMeshArray.from_quad_mesh(mesh)
+	assert snapshot.number_of_vertices() == mesh.number_of_vertices()
+	assert snapshot.number_of_faces() == mesh.number_of_faces()
+	assert snapshot.number_of_edges() == mesh.number_of_edges()
+	assert snapshot.to_quad_mesh().to_vertices_and_faces() == mesh.to_vertices_and_faces()
+
+
+def test_snapshot_read_only():
+	snapshot = QuadMeshArray.from_quad_mesh(coarse_quad_mesh())
+	with pytest.raises(ValueError):
+		snapshot.xyz[0, 0] = 1.0
+
+
+def test_snapshot_geometry():
+	mesh = coarse_quad_mesh()
+	snapshot = QuadMeshArray.from_quad_mesh(mesh)
+	assert np.allclose(snapshot.face_centroids(), [mesh.face_centroid(fkey) for fkey in snapshot.face_keys])
+	edges = [(snapshot.vertex_keys[u], snapshot.vertex_keys[v]) for u, v in snapshot.edges().tolist()]
+	assert np.allclose(snapshot.edge_lengths(), [mesh.edge_length(u, v) for u, v in edges])
+
+
+def test_snapshot_topology():
+	mesh = coarse_quad_mesh()
+	snapshot = QuadMeshArray.from_quad_mesh(mesh)
+	assert snapshot.vertex_degrees().tolist() == [mesh.vertex_degree(vkey) for vkey in snapshot.vertex_keys]
+	assert snapshot.vertex_boundary_mask().tolist() == [mesh.is_vertex_on_boundary(vkey) for vkey in snapshot.vertex_keys]
+	assert sorted(snapshot.singularities()) == sorted(mesh.singularities())
+	assert sorted(sorted(boundary) for boundary in snapshot.boundaries()) == sorted(sorted(boundary) for boundary in mesh.boundaries())
+	assert edge_sets(snapshot.strips()) == edge_sets(mesh.strip.values())
+	assert edge_sets([zip(polyedge[: -1], polyedge[1 :]) for polyedge in snapshot.polyedges()]) == edge_sets([zip(polyedge[: -1], polyedge[1 :]) for polyedge in mesh.polyedges()])
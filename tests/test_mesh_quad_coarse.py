@@ -0,0 +1,325 @@
+from math import ceil
+from math import cos
+from math import sin
+
+import pytest
+
+from compas.datastructures.mesh import meshes_join_and_weld
+from compas.datastructures.mesh import mesh_smooth_centroid
+
+from compas.geometry import Polyline
+from compas.geometry import discrete_coons_patch
+
+from compas_pattern.datastructures.mesh_quad.mesh_quad import QuadMesh
+
+from compas_pattern.datastructures.mesh_quad_coarse.mesh_quad_coarse import CoarseQuadMesh
+
+
+def coarse_quad_mesh(d=3):
+	vertices = [[1.909, 11.216, 0.0], [9.717, 9.025, 0.0], [4.361, 4.712, 0.0], [3.813, 13.209, 0.0], [1.909, 13.209, 0.0], [4.765, 2.248, 0.0], [5.793, 9.437, 0.0], [9.161, 6.405, 0.0], [14.287, 5.237, 0.0], [14.287, 2.248, 0.0], [14.287, 13.209, 0.0], [1.909, 2.248, 0.0], [4.15, 10.981, 0.0], [11.538, 5.004, 0.0], [11.43, 2.248, 0.0], [5.793, 6.759, 0.0], [14.287, 10.22, 0.0], [1.909, 4.241, 0.0], [11.43, 13.209, 0.0], [11.736, 10.641, 0.0]]
+	faces = [[7, 15, 2, 13], [15, 6, 12, 2], [6, 1, 19, 12], [1, 7, 13, 19], [8, 16, 19, 13], [16, 10, 18, 19], [18, 3, 12, 19], [3, 4, 0, 12], [0, 17, 2, 12], [17, 11, 5, 2], [5, 14, 13, 2], [14, 9, 8, 13]]
+	mesh = CoarseQuadMesh.from_vertices_and_faces(vertices, faces)
+	mesh.collect_strips()
+	mesh.init_strip_density()
+	mesh.set_strips_density(d)
+	return mesh
+
+
+def welded_densification(mesh):
+	# the patches of the coarse faces welded by the geometric keys of their vertices
+	meshes = []
+	for fkey in mesh.faces():
+		ab, bc, cd, da = [[mesh.edge_point(u, v, float(i) / float(mesh.get_strip_density(mesh.edge_strip((u, v))))) for i in range(0, mesh.get_strip_density(mesh.edge_strip((u, v))) + 1)] for u, v in mesh.face_halfedges(fkey)]
+		vertices, faces = discrete_coons_patch(ab, bc, list(reversed(cd)), list(reversed(da)))
+		meshes.append(QuadMesh.from_vertices_and_faces(vertices, faces))
+	return meshes_join_and_weld(meshes)
+
+
+def geometry(mesh, precision=6):
+	xyz = {vkey: tuple(round(a, precision) for a in mesh.vertex_coordinates(vkey)) for vkey in mesh.vertices()}
+	return sorted(xyz.values()), sorted(tuple(sorted(xyz[vkey] for vkey in mesh.face_vertices(fkey))) for fkey in mesh.faces())
+
+
+# ==============================================================================
+# Densification
+# ==============================================================================
+
+def test_densification_matches_welded_patches():
+	mesh = coarse_quad_mesh()
+	mesh.set_strip_density(0, 5)
+	# the welded vertices are rounded to three decimals
+	assert geometry(mesh.densification(), 3) == geometry(welded_densification(mesh), 3)
+
+
+def test_densification_stitched():
+	mesh = coarse_quad_mesh()
+	mesh.set_strip_density(0, 5)
+	quad_mesh = mesh.densification()
+	# each point is allocated once
+	assert len(set(geometry(quad_mesh)[0])) == quad_mesh.number_of_vertices()
+	assert quad_mesh.is_manifold()
+	assert quad_mesh.euler() == mesh.euler()
+
+
+def test_densification_xyz_numpy():
+	np = pytest.importorskip('numpy')
+	mesh = coarse_quad_mesh()
+	mesh.set_strip_density(0, 5)
+	mesh.set_strip_density(1, 1)
+	edge_keys, face_grids, number_of_vertices = mesh.densification_grids()
+	xyz = mesh.densification_xyz(edge_keys, face_grids, number_of_vertices)
+	assert np.allclose(mesh.densification_xyz_numpy(edge_keys, face_grids, number_of_vertices), xyz)
+
+
+def test_densification_numpy():
+	pytest.importorskip('numpy')
+	mesh_1 = coarse_quad_mesh()
+	mesh_1.set_strip_density(0, 5)
+	mesh_2 = coarse_quad_mesh()
+	mesh_2.set_strip_density(0, 5)
+	assert geometry(mesh_1.densification_numpy()) == geometry(mesh_2.densification())
+
+
+def test_geometrical_densification():
+	mesh_1 = coarse_quad_mesh()
+	mesh_1.set_strip_density(0, 5)
+	mesh_2 = coarse_quad_mesh()
+	mesh_2.set_strip_density(0, 5)
+	# without quad mesh, the polyedges are the coarse edges
+	assert geometry(mesh_1.geometrical_densification()) == geometry(mesh_2.densification())
+
+
+def test_geometrical_densification_resampling():
+	mesh = coarse_quad_mesh()
+	quad_mesh = mesh.geometrical_densification()
+	# bend the polyedges of the denser quad mesh
+	for vkey in quad_mesh.vertices():
+		x, y, z = quad_mesh.vertex_coordinates(vkey)
+		quad_mesh.set_vertex_attribute(vkey, 'z', sin(x) * cos(y))
+	polylines = {(u, v): Polyline([quad_mesh.vertex_coordinates(vkey) for vkey in mesh.edge_to_polyedge[u][v]]) for u, v in mesh.edges()}
+	mesh.set_strips_density(4)
+	quad_mesh = mesh.geometrical_densification()
+	# the points along the coarse edges are evenly spaced along the previous polyedges
+	for (u, v), polyline in polylines.items():
+		for i, vkey in enumerate(mesh.edge_to_polyedge[u][v]):
+			assert quad_mesh.vertex_coordinates(vkey) == pytest.approx(list(polyline.point(i / 4.0)))
+
+
+def test_geometrical_densification_numpy():
+	np = pytest.importorskip('numpy')
+	meshes = []
+	for vectorized in [False, True]:
+		mesh = coarse_quad_mesh()
+		quad_mesh = mesh.geometrical_densification()
+		for vkey in quad_mesh.vertices():
+			x, y, z = quad_mesh.vertex_coordinates(vkey)
+			quad_mesh.set_vertex_attribute(vkey, 'z', sin(x) * cos(y))
+		mesh.set_strips_density(4)
+		meshes.append(mesh.geometrical_densification_numpy() if vectorized else mesh.geometrical_densification())
+	xyz_1, xyz_2 = [[mesh.vertex_coordinates(vkey) for vkey in mesh.vertices()] for mesh in meshes]
+	assert np.allclose(xyz_1, xyz_2)
+	assert geometry(meshes[0])[1] == geometry(meshes[1])[1]
+
+
+def test_densification_parallel():
+	mesh_1 = coarse_quad_mesh()
+	mesh_1.set_strip_density(0, 5)
+	mesh_2 = coarse_quad_mesh()
+	mesh_2.set_strip_density(0, 5)
+	assert geometry(mesh_1.densification(parallel=True, workers=2)) == geometry(mesh_2.densification())
+
+
+def test_densification_xyz_parallel():
+	mesh = coarse_quad_mesh()
+	mesh.set_strip_density(0, 5)
+	mesh.set_strip_density(1, 1)
+	edge_keys, face_grids, number_of_vertices = mesh.densification_grids()
+	xyz = mesh.densification_xyz(edge_keys, face_grids, number_of_vertices)
+	for workers in [1, 3]:
+		assert mesh.densification_xyz_parallel(edge_keys, face_grids, number_of_vertices, workers) == xyz
+
+
+def test_densification_blocks():
+	mesh_1 = coarse_quad_mesh()
+	mesh_1.set_strip_density(0, 5)
+	vertices, faces = [], []
+	for block_vertices, block_faces in mesh_1.densification_blocks():
+		vertices += block_vertices
+		faces += block_faces
+	mesh_2 = coarse_quad_mesh()
+	mesh_2.set_strip_density(0, 5)
+	assert geometry(QuadMesh.from_vertices_and_faces(vertices, faces)) == geometry(mesh_2.densification())
+
+
+def test_densification_to_obj(tmpdir):
+	mesh = coarse_quad_mesh()
+	mesh.set_strip_density(0, 5)
+	filepath = str(tmpdir.join('densification.obj'))
+	number_of_vertices, number_of_faces = mesh.densification_to_obj(filepath, precision='12f')
+	quad_mesh = QuadMesh.from_obj(filepath)
+	assert (quad_mesh.number_of_vertices(), quad_mesh.number_of_faces()) == (number_of_vertices, number_of_faces)
+	assert geometry(quad_mesh) == geometry(mesh.densification())
+
+
+def test_densification_preview():
+	mesh = coarse_quad_mesh()
+	mesh.set_strip_density(0, 5)
+	mesh.set_strip_density(1, 1)
+	preview = mesh.densification_preview()
+	quad_mesh = mesh.densification()
+	assert preview['vertices'] == quad_mesh.number_of_vertices()
+	assert preview['edges'] == quad_mesh.number_of_edges()
+	assert preview['faces'] == quad_mesh.number_of_faces()
+	assert preview['triangles'] == 0
+	assert preview['memory'] == 760 * preview['vertices'] + 510 * preview['faces']
+	assert preview['memory_numpy'] == 3 * 8 * preview['vertices'] + 4 * 8 * preview['faces']
+
+
+# ==============================================================================
+# Density solver
+# ==============================================================================
+
+def test_strips_width_numpy():
+	pytest.importorskip('numpy')
+	mesh = coarse_quad_mesh()
+	widths = mesh.strips_width_numpy()
+	for skey in mesh.strips():
+		lengths = [mesh.edge_length(u, v) for u, v in mesh.strip_edges(skey)]
+		assert widths[skey] == pytest.approx(sum(lengths) / len(lengths))
+
+
+def test_set_strips_density_face_target_numpy():
+	pytest.importorskip('numpy')
+	for nb_faces in [12, 100, 1000, 5000]:
+		mesh = coarse_quad_mesh()
+		faces = mesh.set_strips_density_face_target_numpy(nb_faces)
+		assert faces == mesh.densification_preview()['faces'] == mesh.densification().number_of_faces()
+		assert faces <= nb_faces
+		# no strip can be densified without exceeding the target
+		for skey in mesh.strips():
+			d = mesh.get_strip_density(skey)
+			mesh.set_strip_density(skey, d + 1)
+			assert mesh.densification_preview()['faces'] > nb_faces
+			mesh.set_strip_density(skey, d)
+
+
+def test_set_strips_density_face_target_numpy_minimum():
+	pytest.importorskip('numpy')
+	mesh = coarse_quad_mesh()
+	widths = mesh.strips_width_numpy()
+	# the target length sets densities exceeding the target number of faces
+	faces = mesh.set_strips_density_face_target_numpy(12, t=1.0)
+	assert faces > 12
+	for skey in mesh.strips():
+		assert mesh.get_strip_density(skey) == int(ceil(widths[skey]))
+
+
+# ==============================================================================
+# Coarse quad mesh extraction
+# ==============================================================================
+
+def test_from_quad_mesh():
+	quad_mesh = coarse_quad_mesh().densification()
+	mesh = CoarseQuadMesh.from_quad_mesh(quad_mesh)
+	singularity_edges = set([(u, v) for polyedge in quad_mesh.singularity_polyedge_decomposition() for u, v in zip(polyedge[: -1], polyedge[1 :])])
+	# the patches of faces connected accross the edges that are not in the decomposition, by flood filling
+	patches = []
+	visited = set()
+	for fkey in quad_mesh.faces():
+		if fkey in visited:
+			continue
+		patch = [fkey]
+		visited.add(fkey)
+		for current in patch:
+			for u, v in quad_mesh.face_halfedges(current):
+				nbr = quad_mesh.halfedge[v][u]
+				if nbr is not None and nbr not in visited and (u, v) not in singularity_edges and (v, u) not in singularity_edges:
+					visited.add(nbr)
+					patch.append(nbr)
+		patches.append(patch)
+	# the corners of a patch are in only one of its faces
+	corners = []
+	for patch in patches:
+		vertices = [vkey for fkey in patch for vkey in quad_mesh.face_vertices(fkey)]
+		corners.append(sorted(vkey for vkey in set(vertices) if vertices.count(vkey) == 1))
+	assert sorted(sorted(mesh.face_vertices(fkey)) for fkey in mesh.faces()) == sorted(corners)
+	for vkey in mesh.vertices():
+		assert mesh.vertex_coordinates(vkey) == quad_mesh.vertex_coordinates(vkey)
+	assert mesh.euler() == quad_mesh.euler()
+	assert mesh.quad_mesh is quad_mesh
+
+
+# ==============================================================================
+# Incremental densification
+# ==============================================================================
+
+def test_densification_incremental_matches_full():
+	mesh = coarse_quad_mesh()
+	mesh.densification()
+	mesh.set_strip_density(0, 5)
+	mesh.set_vertex_attribute(6, 'x', 6.0)
+	quad_mesh = mesh.densification()
+
+	full_mesh = coarse_quad_mesh()
+	full_mesh.set_strip_density(0, 5)
+	full_mesh.set_vertex_attribute(6, 'x', 6.0)
+	assert geometry(quad_mesh) == geometry(full_mesh.densification())
+
+
+def test_densification_incremental_new_mesh():
+	mesh = coarse_quad_mesh()
+	quad_mesh_1 = mesh.densification()
+	kept = geometry(quad_mesh_1)
+	mesh.set_strip_density(0, 5)
+	quad_mesh_2 = mesh.densification()
+	# a new quad mesh is built and the previous one is unchanged
+	assert quad_mesh_2 is not quad_mesh_1
+	assert quad_mesh_2 is mesh.quad_mesh
+	assert geometry(quad_mesh_1) == kept
+
+
+def test_densification_incremental_reuses_patches():
+	mesh = coarse_quad_mesh()
+	mesh.densification()
+	mesh.set_strip_density(0, 5)
+	faces = []
+	densification_xyz = mesh.densification_xyz
+	mesh.densification_xyz = lambda edge_keys, face_grids, number_of_vertices: faces.extend(face_grids) or densification_xyz(edge_keys, face_grids, number_of_vertices)
+	mesh.densification()
+	# only the patches of the faces crossed by the strip are computed again
+	assert sorted(faces) == sorted(set(mesh.strip_faces(0)))
+
+
+def test_densification_incremental_after_smoothing():
+	mesh = coarse_quad_mesh()
+	# the denser quad mesh is smoothed through its vertex dictionaries, without updating its version
+	mesh_smooth_centroid(mesh.densification(), kmax=10)
+	mesh.set_strip_density(0, 5)
+	quad_mesh = mesh.densification()
+
+	full_mesh = coarse_quad_mesh()
+	full_mesh.set_strip_density(0, 5)
+	assert geometry(quad_mesh) == geometry(full_mesh.densification())
+
+
+def test_densification_incremental_after_direct_vertex_move():
+	mesh = coarse_quad_mesh()
+	mesh.densification()
+	# the coarse vertices are moved through the vertex dictionaries, without updating the version
+	mesh_smooth_centroid(mesh, fixed=mesh.vertices_on_boundary(), kmax=1)
+	quad_mesh = mesh.densification()
+
+	full_mesh = coarse_quad_mesh()
+	for vkey in full_mesh.vertices():
+		full_mesh.vertex[vkey].update(mesh.vertex[vkey])
+	assert geometry(quad_mesh) == geometry(full_mesh.densification())
+
+
+def test_densification_after_quad_mesh_edit():
+	mesh = coarse_quad_mesh()
+	quad_mesh_1 = mesh.densification()
+	quad_mesh_1.set_vertex_attribute(0, 'z', 1.0)
+	# the denser quad mesh was edited, hence it is regenerated
+	quad_mesh_2 = mesh.densification()
+	assert quad_mesh_2 is not quad_mesh_1
+	assert geometry(quad_mesh_2) == geometry(coarse_quad_mesh().densification())
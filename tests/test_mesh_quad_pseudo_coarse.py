@@ -0,0 +1,67 @@
+from math import cos
+from math import sin
+from math import pi
+
+from compas_pattern.datastructures.mesh_quad_pseudo_coarse.mesh_quad_pseudo_coarse import CoarsePseudoQuadMesh
+
+
+def pseudo_fan(n, d):
+	# a fan of pseudo quads around a pole, surrounded by quads
+	vertices = [[0.0, 0.0, 0.0]] + [[cos(2 * pi * i / n), sin(2 * pi * i / n), 0.0] for i in range(n)] + [[2 * cos(2 * pi * i / n), 2 * sin(2 * pi * i / n), 0.0] for i in range(n)]
+	faces = [[0, 1 + i, 1 + (i + 1) % n] for i in range(n)] + [[1 + i, 1 + n + i, 1 + n + (i + 1) % n, 1 + (i + 1) % n] for i in range(n)]
+	mesh = CoarsePseudoQuadMesh.from_vertices_and_faces_with_poles(vertices, faces, [[0.0, 0.0, 0.0]])
+	mesh.collect_strips()
+	mesh.init_strip_density()
+	mesh.set_strips_density(d)
+	return mesh
+
+
+def test_densification_poles():
+	mesh = pseudo_fan(6, 3)
+	quad_mesh = mesh.densification()
+	triangles = [fkey for fkey in quad_mesh.faces() if len(quad_mesh.face_vertices(fkey)) == 3]
+	# all the triangles around the pole are pseudo quads, with the dense vertex of the pole
+	assert len(triangles) == 18
+	assert sorted(quad_mesh.face_pole) == sorted(triangles)
+	assert quad_mesh.poles() == [0]
+	assert quad_mesh.vertex_coordinates(0) == [0.0, 0.0, 0.0]
+	for fkey in triangles:
+		assert quad_mesh.face_pole[fkey] in quad_mesh.face_vertices(fkey)
+
+
+def test_densification_stitched():
+	mesh = pseudo_fan(6, 3)
+	quad_mesh = mesh.densification()
+	xyz = set([tuple(round(a, 6) for a in quad_mesh.vertex_coordinates(vkey)) for vkey in quad_mesh.vertices()])
+	assert len(xyz) == quad_mesh.number_of_vertices()
+	assert quad_mesh.is_manifold()
+
+
+def test_densification_preview():
+	mesh = pseudo_fan(5, 4)
+	preview = mesh.densification_preview()
+	quad_mesh = mesh.densification()
+	assert preview['vertices'] == quad_mesh.number_of_vertices()
+	assert preview['faces'] == quad_mesh.number_of_faces()
+	assert preview['triangles'] == len(quad_mesh.face_pole)
+
+
+def test_densification_incremental():
+	mesh = pseudo_fan(6, 3)
+	mesh.densification()
+	mesh.set_strip_density(0, 5)
+	mesh.vertex[7]['x'] = 2.5
+	faces = []
+	densification_xyz = mesh.densification_xyz
+	mesh.densification_xyz = lambda edge_keys, face_grids, number_of_vertices: faces.extend(face_grids) or densification_xyz(edge_keys, face_grids, number_of_vertices)
+	quad_mesh = mesh.densification()
+	# only the patches of the faces crossed by the strip or around the moved vertex are computed again
+	assert sorted(faces) == sorted(set(mesh.strip_faces(0) + mesh.vertex_faces(7)))
+
+	full_mesh = pseudo_fan(6, 3)
+	full_mesh.set_strip_density(0, 5)
+	full_mesh.vertex[7]['x'] = 2.5
+	full_quad_mesh = full_mesh.densification()
+	assert sorted(quad_mesh.vertex_coordinates(vkey) for vkey in quad_mesh.vertices()) == sorted(full_quad_mesh.vertex_coordinates(vkey) for vkey in full_quad_mesh.vertices())
+	assert quad_mesh.face_pole == full_quad_mesh.face_pole
+	assert quad_mesh.poles() == [0]
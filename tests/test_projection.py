@@ -0,0 +1,56 @@
+import pytest
+
+from compas_pattern.datastructures.mesh_quad.mesh_quad import QuadMesh
+
+import compas_pattern.algorithms.projection.projection as projection
+
+from compas_pattern.algorithms.projection.projection import two_colourable_projection
+
+
+def coarse_quad_mesh():
+	vertices = [[1.909, 11.216, 0.0], [9.717, 9.025, 0.0], [4.361, 4.712, 0.0], [3.813, 13.209, 0.0], [1.909, 13.209, 0.0], [4.765, 2.248, 0.0], [5.793, 9.437, 0.0], [9.161, 6.405, 0.0], [14.287, 5.237, 0.0], [14.287, 2.248, 0.0], [14.287, 13.209, 0.0], [1.909, 2.248, 0.0], [4.15, 10.981, 0.0], [11.538, 5.004, 0.0], [11.43, 2.248, 0.0], [5.793, 6.759, 0.0], [14.287, 10.22, 0.0], [1.909, 4.241, 0.0], [11.43, 13.209, 0.0], [11.736, 10.641, 0.0]]
+	faces = [[7, 15, 2, 13], [15, 6, 12, 2], [6, 1, 19, 12], [1, 7, 13, 19], [8, 16, 19, 13], [16, 10, 18, 19], [18, 3, 12, 19], [3, 4, 0, 12], [0, 17, 2, 12], [17, 11, 5, 2], [5, 14, 13, 2], [14, 9, 8, 13]]
+	mesh = QuadMesh.from_vertices_and_faces(vertices, faces)
+	mesh.collect_strips()
+	return mesh
+
+
+def mesh_data(mesh):
+	return mesh.to_vertices_and_faces(), {skey: list(edges) for skey, edges in mesh.strip.items()}
+
+
+def test_two_colourable_projection_leaves_mesh():
+	mesh = coarse_quad_mesh()
+	data = mesh_data(mesh)
+	results = two_colourable_projection(mesh, kmax=2)
+	assert any(type(result) == tuple for result in results.values())
+	assert mesh_data(mesh) == data
+	assert not mesh.is_recording()
+
+
+def test_two_colourable_projection_in_transaction():
+	mesh = coarse_quad_mesh()
+	mesh.begin()
+	mesh.set_vertex_attribute(0, 'z', 1.0)
+	data = mesh_data(mesh)
+	two_colourable_projection(mesh, kmax=1)
+	# the transaction of the caller goes on
+	assert mesh.is_recording()
+	assert mesh_data(mesh) == data
+	mesh.rollback()
+	assert mesh.vertex_coordinates(0)[2] == 0.0
+
+
+def test_two_colourable_projection_error(monkeypatch):
+	mesh = coarse_quad_mesh()
+	data = mesh_data(mesh)
+
+	def delete_strips(mesh, skeys, preserve_boundaries=False):
+		mesh.delete_face(0)
+		raise ValueError
+
+	monkeypatch.setattr(projection, 'delete_strips', delete_strips)
+	with pytest.raises(ValueError):
+		two_colourable_projection(mesh, kmax=1)
+	assert mesh_data(mesh) == data
+	assert not mesh.is_recording()
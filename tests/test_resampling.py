@@ -0,0 +1,40 @@
+import pytest
+
+from compas.geometry import Polyline
+
+from compas_pattern.geometry.resampling import resample_polylines
+from compas_pattern.geometry.resampling import resample_polylines_numpy
+
+
+def polylines_and_parameters():
+	polylines = [
+		[[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [1.0, 2.0, 0.0]],
+		[[0.0, 0.0, 0.0], [0.0, 0.0, 4.0]],
+		# a polyline with a segment of length zero
+		[[0.0, 0.0, 0.0], [1.0, 1.0, 1.0], [1.0, 1.0, 1.0], [2.0, 2.0, 2.0]],
+	]
+	parameters = [[0.0, 0.25, 0.5, 1.0], [0.0, 0.3, 1.0], [0.0, 0.5, 0.75, 1.0]]
+	return polylines, parameters
+
+
+def test_resample_polylines():
+	polylines, parameters = polylines_and_parameters()
+	resampled = resample_polylines(polylines, parameters)
+	assert resampled[0] == [[0.0, 0.0, 0.0], [0.75, 0.0, 0.0], [1.0, 0.5, 0.0], [1.0, 2.0, 0.0]]
+	for points, params, polyline in zip(polylines, parameters, resampled):
+		for t, xyz in zip(params, polyline):
+			assert xyz == pytest.approx(list(Polyline(points).point(t)))
+
+
+def test_resample_polylines_degenerate():
+	# a polyline of length zero gives its first point
+	assert resample_polylines([[[1.0, 2.0, 3.0], [1.0, 2.0, 3.0]]], [[0.0, 0.5, 1.0]]) == [[[1.0, 2.0, 3.0]] * 3]
+
+
+def test_resample_polylines_numpy():
+	np = pytest.importorskip('numpy')
+	polylines, parameters = polylines_and_parameters()
+	polylines.append([[1.0, 2.0, 3.0], [1.0, 2.0, 3.0]])
+	parameters.append([0.0, 0.5, 1.0])
+	resampled = resample_polylines(polylines, parameters)
+	assert np.allclose(resample_polylines_numpy(polylines, parameters), [xyz for polyline in resampled for xyz in polyline])
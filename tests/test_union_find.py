@@ -0,0 +1,21 @@
+from compas_pattern.utilities.union_find import union_find_groups
+
+
+def test_union_find_groups():
+	assert union_find_groups(range(8), [(0, 3), (3, 5), (6, 7)]) == [[0, 3, 5], [1], [2], [4], [6, 7]]
+
+
+def test_union_find_groups_order():
+	# the groups and their items are sorted by first occurence in the items
+	assert union_find_groups([5, 3, 0, 1], [(0, 3), (3, 5)]) == [[5, 3, 0], [1]]
+
+
+def test_union_find_groups_items_in_pairs():
+	# the items only in the pairs are added after the items
+	assert union_find_groups([0, 1], [(1, 2), (3, 4), (0, 0)]) == [[0], [1, 2], [3, 4]]
+
+
+def test_union_find_groups_long_chain():
+	n = 100000
+	groups = union_find_groups(range(n), [(i + 1, i) for i in range(n - 1)])
+	assert groups == [list(range(n))]
@@ -0,0 +1,66 @@
+from compas_pattern.algorithms.walking.walking import Walker
+from compas_pattern.datastructures.mesh_quad.grammar_pattern import rebuild_geometry
+
+
+def square_walker():
+	walker = Walker.from_vertices_and_faces([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [1.0, 1.0, 0.0], [0.0, 1.0, 0.0]], [[0, 1, 2, 3]])
+	walker.collect_strips()
+	walker.unify_cycles()
+	walker.start_walking()
+	return walker
+
+
+def topology(mesh):
+	return sorted(sorted(mesh.face_vertices(fkey)) for fkey in mesh.faces())
+
+
+def geometry(mesh):
+	return {vkey: mesh.vertex_coordinates(vkey) for vkey in mesh.vertices()}
+
+
+# ==============================================================================
+# Application
+# ==============================================================================
+
+def walk_step_by_step(walker, string, k_ring=3):
+	for rule in string:
+		if rule == 'f':
+			walker.forward()
+		elif rule == 'r':
+			walker.rotate()
+		elif rule == 's':
+			walker.start_polyedge()
+		elif rule == 'e':
+			walker.end_polyedge(k_ring)
+
+
+def test_apply_rules_matches_step_by_step():
+	string = 'fsffesfrfffe'
+	walker_1 = square_walker()
+	walker_1.apply_rules(string)
+	walker_2 = square_walker()
+	walk_step_by_step(walker_2, string)
+	assert walker_1.number_of_faces() > 1
+	assert topology(walker_1) == topology(walker_2)
+	assert geometry(walker_1) == geometry(walker_2)
+	assert (walker_1.position, walker_1.direction) == (walker_2.position, walker_2.direction)
+
+
+def test_apply_rules_global_smoothing():
+	string = 'fsffesfrfffe'
+	walker_1 = square_walker()
+	walker_1.apply_rules(string, k_ring=None)
+	walker_2 = square_walker()
+	walk_step_by_step(walker_2, string, k_ring=None)
+	assert geometry(walker_1) == geometry(walker_2)
+
+
+def test_apply_rules_topology_only():
+	string = 'fsffesfrfffe'
+	walker_1 = square_walker()
+	walker_1.apply_rules(string, geometry=False)
+	rebuild_geometry(walker_1)
+	walker_2 = square_walker()
+	walk_step_by_step(walker_2, string)
+	assert topology(walker_1) == topology(walker_2)
+	assert (walker_1.position, walker_1.direction) == (walker_2.position, walker_2.direction)